@@ -0,0 +1,157 @@
+import hashlib
+import math
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List
+
+
+class HyperLogLog:
+    """Estimasi jumlah nilai unik dengan memori tetap (2^precision byte)."""
+
+    def __init__(self, precision: int = 12):
+        self.precision = precision
+        self.m = 1 << precision
+        self.registers = bytearray(self.m)
+
+    def add(self, value: str):
+        h = int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big')
+        index = h >> (64 - self.precision)
+        rest = h & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: 'HyperLogLog'):
+        if other.precision != self.precision:
+            raise ValueError("Precision HyperLogLog berbeda")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def count(self) -> int:
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # koreksi untuk jumlah kecil (linear counting)
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+
+class StreamingStats:
+    """Agregat hasil analyze_phone_number tanpa menyimpan report per nomor.
+
+    Objek ini bisa di-pickle dan digabung (merge), jadi setiap worker process
+    mengumpulkan statistiknya sendiri lalu digabung di akhir.
+    """
+
+    DIMENSIONS = ('provider', 'region', 'kategori', 'tipe_nomor')
+
+    def __init__(self, precision: int = 12):
+        self.precision = precision
+        self.total = 0
+        self.valid = 0
+        self.errors = Counter()
+        self.counts = {dimension: Counter() for dimension in self.DIMENSIONS}
+        self.distinct = {dimension: {} for dimension in self.DIMENSIONS}
+        self.distinct_numbers = HyperLogLog(precision)
+
+    @staticmethod
+    def _values(result: Dict[str, Any]) -> Dict[str, str]:
+        return {
+            'provider': result['provider']['nama'],
+            'region': result['lokasi']['region'],
+            'kategori': result['nomor']['kategori'],
+            'tipe_nomor': result['validasi']['tipe_nomor']
+        }
+
+    def add(self, result: Dict[str, Any]):
+        self.total += 1
+        if "error" in result:
+            self.errors[result["error"]] += 1
+            return
+
+        self.valid += 1
+        number = result['nomor']['format_e164']
+        self.distinct_numbers.add(number)
+        for dimension, value in self._values(result).items():
+            self.counts[dimension][value] += 1
+            hll = self.distinct[dimension].get(value)
+            if hll is None:
+                hll = self.distinct[dimension][value] = HyperLogLog(self.precision)
+            hll.add(number)
+
+    def merge(self, other: 'StreamingStats'):
+        self.total += other.total
+        self.valid += other.valid
+        self.errors.update(other.errors)
+        self.distinct_numbers.merge(other.distinct_numbers)
+        for dimension in self.DIMENSIONS:
+            self.counts[dimension].update(other.counts[dimension])
+            for value, hll in other.distinct[dimension].items():
+                if value not in self.distinct[dimension]:
+                    self.distinct[dimension][value] = HyperLogLog(self.precision)
+                self.distinct[dimension][value].merge(hll)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "total": self.total,
+            "valid": self.valid,
+            "tingkat_valid": self.valid / self.total if self.total else 0.0,
+            "nomor_unik": self.distinct_numbers.count(),
+            "error": dict(self.errors.most_common()),
+            **{
+                dimension: {
+                    value: {"jumlah": count, "nomor_unik": self.distinct[dimension][value].count()}
+                    for value, count in self.counts[dimension].most_common()
+                }
+                for dimension in self.DIMENSIONS
+            }
+        }
+
+
+_analyzer = None
+
+
+def _init_worker():
+    global _analyzer
+    from chip import PhoneNumberAnalyzer
+    _analyzer = PhoneNumberAnalyzer()
+
+
+def _aggregate_chunk(numbers: List[str]) -> StreamingStats:
+    stats = StreamingStats()
+    for number in numbers:
+        stats.add(_analyzer.analyze_phone_number(number, save=False))
+    return stats
+
+
+def _chunks(numbers: Iterable[str], size: int) -> Iterator[List[str]]:
+    chunk = []
+    for number in numbers:
+        chunk.append(number)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def run_aggregate(numbers: Iterable[str], processes: int = 1, chunk_size: int = 1000) -> StreamingStats:
+    """Analisis nomor secara streaming, hanya agregat yang disimpan (tanpa insert ke database)."""
+    stats = StreamingStats()
+    if processes <= 1:
+        _init_worker()
+        for chunk in _chunks(numbers, chunk_size):
+            stats.merge(_aggregate_chunk(chunk))
+        return stats
+
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker) as pool:
+        pending = []
+        for chunk in _chunks(numbers, chunk_size):
+            pending.append(pool.submit(_aggregate_chunk, chunk))
+            # batasi chunk yang sedang berjalan agar memori tetap konstan
+            if len(pending) >= processes * 2:
+                stats.merge(pending.pop(0).result())
+        for future in pending:
+            stats.merge(future.result())
+    return stats
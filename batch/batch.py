@@ -0,0 +1,271 @@
+import argparse
+import json
+import os
+import sqlite3
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'posh'))
+sys.path.insert(0, os.path.join(ROOT, 'chip'))
+sys.path.insert(0, os.path.join(ROOT, 'shared'))
+
+from phonenumbers import NumberParseException
+from aggregate import run_aggregate
+from scheduler import BULK
+from sections import json_default
+
+
+class BatchJournal:
+    """Jurnal progres batch: offset input berikutnya, key yang sudah selesai dan key yang gagal.
+
+    Jurnal disimpan di database yang sama dengan hasil analisis, sehingga hasil dan
+    tanda selesai di-commit dalam satu transaksi dan crash tidak menghasilkan baris ganda.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, job_id: str):
+        self.conn = conn
+        self.job_id = job_id
+        conn.execute('''CREATE TABLE IF NOT EXISTS batch_jobs
+                        (job_id TEXT PRIMARY KEY, input_path TEXT, input_offset INTEGER,
+                        status TEXT, started TEXT, updated TEXT)''')
+        conn.execute('''CREATE TABLE IF NOT EXISTS batch_done
+                        (job_id TEXT, key TEXT, PRIMARY KEY (job_id, key))''')
+        # nomor yang gagal tidak ditandai selesai. retry=1: kegagalan sementara (upstream down,
+        # report tidak lengkap) untuk --retry-errors; retry=0: permanen (nomor tidak valid)
+        conn.execute('''CREATE TABLE IF NOT EXISTS batch_errors
+                        (job_id TEXT, key TEXT, error TEXT, retry INTEGER, updated TEXT,
+                        PRIMARY KEY (job_id, key))''')
+        conn.commit()
+
+    def resume(self, input_path: str) -> int:
+        row = self.conn.execute("SELECT input_offset FROM batch_jobs WHERE job_id = ?", (self.job_id,)).fetchone()
+        if row is not None:
+            return row[0]
+        now = datetime.now().isoformat()
+        with self.conn:
+            self.conn.execute("INSERT INTO batch_jobs VALUES (?, ?, 0, 'running', ?, ?)",
+                              (self.job_id, os.path.abspath(input_path), now, now))
+        return 0
+
+    def is_done(self, key: str) -> bool:
+        return self.conn.execute("SELECT 1 FROM batch_done WHERE job_id = ? AND key = ?",
+                                 (self.job_id, key)).fetchone() is not None
+
+    def failed(self) -> List[str]:
+        return [row[0] for row in self.conn.execute(
+            "SELECT key FROM batch_errors WHERE job_id = ? AND retry = 1 ORDER BY rowid", (self.job_id,))]
+
+    def checkpoint(self, done: List[str], offset: int = None, errors: Dict[str, Tuple[str, bool]] = None):
+        # dipanggil di dalam transaksi yang sama dengan penulisan hasil; offset None = retry, offset tetap
+        now = datetime.now().isoformat()
+        done_rows = [(self.job_id, key) for key in done]
+        self.conn.executemany("INSERT OR IGNORE INTO batch_done VALUES (?, ?)", done_rows)
+        self.conn.executemany("DELETE FROM batch_errors WHERE job_id = ? AND key = ?", done_rows)
+        self.conn.executemany("INSERT OR REPLACE INTO batch_errors VALUES (?, ?, ?, ?, ?)",
+                              [(self.job_id, key, error, int(retry), now)
+                               for key, (error, retry) in (errors or {}).items()])
+        if offset is not None:
+            self.conn.execute("UPDATE batch_jobs SET input_offset = ?, updated = ? WHERE job_id = ?",
+                              (offset, now, self.job_id))
+
+    def finish(self):
+        with self.conn:
+            self.conn.execute("UPDATE batch_jobs SET status = 'done', updated = ? WHERE job_id = ?",
+                              (datetime.now().isoformat(), self.job_id))
+
+
+class ChipEngine:
+    db_path = 'phone_analysis.db'
+
+    def __init__(self, report_dir: str = None):
+        from chip import PhoneNumberAnalyzer
+        self.analyzer = PhoneNumberAnalyzer()
+
+    def prepare(self, conn: sqlite3.Connection):
+        pass
+
+    def process(self, number: str) -> Dict[str, Any]:
+        return self.analyzer.analyze_phone_number(number, save=False)
+
+    def write(self, conn: sqlite3.Connection, number: str, result: Dict[str, Any]):
+        self.analyzer.save_analysis(number, result, conn)
+
+    def failure(self, result) -> Optional[Tuple[str, bool]]:
+        # analisis chip tidak memakai jaringan: error selalu karena input, retry tidak berguna
+        return (str(result["error"]), False) if "error" in result else None
+
+
+class PoshEngine:
+    db_path = 'phone_intel.db'
+
+    def __init__(self, report_dir: str = None):
+        from posh2 import PhoneIntelligence
+        self.intel = PhoneIntelligence()
+        self.report_dir = report_dir
+        if report_dir:
+            os.makedirs(report_dir, exist_ok=True)
+
+    def prepare(self, conn: sqlite3.Connection):
+        conn.execute('''CREATE TABLE IF NOT EXISTS phone_records (
+                            phone_number TEXT PRIMARY KEY,
+                            analysis_data TEXT,
+                            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+                        )''')
+        conn.commit()
+
+    def process(self, number: str) -> Dict[str, Any]:
+        try:
+            return self.intel.generate_report(number, priority=BULK)
+        except (NumberParseException, ValueError) as e:
+            # nomor tidak valid gagal dengan cara yang sama di setiap retry
+            return {"error": str(e), "permanent": True}
+        except Exception as e:
+            return {"error": str(e)}
+
+    def failure(self, result: Dict[str, Any]) -> Optional[Tuple[str, bool]]:
+        if "error" in result:
+            return str(result["error"]), not result.get("permanent", False)
+        # report tetap jadi walau sumber eksternal gagal; nomor baru selesai setelah report lengkap
+        failed = self.intel.failed_sections(result)
+        if failed:
+            return f"sumber gagal: {', '.join(failed)}", True
+        return None
+
+    def write(self, conn: sqlite3.Connection, number: str, result: Dict[str, Any]):
+        data = json.dumps(result, ensure_ascii=False, default=json_default)
+        # key E.164 seperti save_report/watchlist; phone_number adalah primary key, jadi
+        # "0812..." dan "+62 812..." untuk nomor yang sama tetap satu baris
+        number = result['informasi_dasar']['format_e164']
+        conn.execute("INSERT OR REPLACE INTO phone_records (phone_number, analysis_data, timestamp) "
+                     "VALUES (?, ?, CURRENT_TIMESTAMP)", (number, data))
+        if self.report_dir:
+            path = os.path.join(self.report_dir, f'report_{number}.json')
+            with open(f'{path}.tmp', 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(f'{path}.tmp', path)
+
+
+ENGINES = {
+    'chip': ChipEngine,
+    'posh': PoshEngine
+}
+
+
+def read_numbers(input_path: str, offset: int) -> Iterator[Tuple[str, int]]:
+    # menghasilkan (nomor, offset byte setelah baris tersebut)
+    with open(input_path, 'rb') as f:
+        f.seek(offset)
+        for line in iter(f.readline, b''):
+            yield line.decode('utf-8').strip(), f.tell()
+
+
+def _flush(engine, conn: sqlite3.Connection, journal: BatchJournal, pool, chunk: List[str],
+           offset: int, stats: Dict[str, int]):
+    results = list(pool.map(engine.process, chunk)) if pool else [engine.process(n) for n in chunk]
+    done: List[str] = []
+    errors: Dict[str, Tuple[str, bool]] = {}
+    with conn:
+        for number, result in zip(chunk, results):
+            failure = engine.failure(result)
+            if "error" not in result:
+                # report tidak lengkap tetap ditulis; retry yang berhasil menimpanya
+                engine.write(conn, number, result)
+            if failure is None:
+                done.append(number)
+            else:
+                errors[number] = failure
+        # hanya nomor yang berhasil lengkap ditandai selesai, sisanya masuk batch_errors
+        journal.checkpoint(done, offset, errors)
+    if not chunk:
+        return
+    stats["processed"] += len(done)
+    stats["errors"] += len(errors)
+    print(f"[{journal.job_id}] {stats['processed']} diproses, {stats['skipped']} dilewati, {stats['errors']} error")
+
+
+def run_batch(engine, input_path: str, job_id: str, chunk_size: int = 100, workers: int = 1) -> Dict[str, int]:
+    conn = sqlite3.connect(engine.db_path)
+    engine.prepare(conn)
+    journal = BatchJournal(conn, job_id)
+    offset = journal.resume(input_path)
+    stats = {"processed": 0, "skipped": 0, "errors": 0}
+    pool = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+
+    try:
+        chunk: List[str] = []
+        pending = set()
+        for number, next_offset in read_numbers(input_path, offset):
+            offset = next_offset
+            if not number or number in pending or journal.is_done(number):
+                stats["skipped"] += 1
+                continue
+            chunk.append(number)
+            pending.add(number)
+            if len(chunk) >= chunk_size:
+                _flush(engine, conn, journal, pool, chunk, offset, stats)
+                chunk, pending = [], set()
+        _flush(engine, conn, journal, pool, chunk, offset, stats)
+        journal.finish()
+    finally:
+        if pool:
+            pool.shutdown()
+        conn.close()
+
+    return stats
+
+
+def retry_errors(engine, job_id: str, chunk_size: int = 100, workers: int = 1) -> Dict[str, int]:
+    """Proses ulang nomor di batch_errors yang gagal sementara; yang berhasil dihapus dari daftar error."""
+    conn = sqlite3.connect(engine.db_path)
+    engine.prepare(conn)
+    journal = BatchJournal(conn, job_id)
+    stats = {"processed": 0, "skipped": 0, "errors": 0}
+    pool = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        failed = journal.failed()
+        for start in range(0, len(failed), chunk_size):
+            _flush(engine, conn, journal, pool, failed[start:start + chunk_size], None, stats)
+    finally:
+        if pool:
+            pool.shutdown()
+        conn.close()
+
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch analisis nomor dengan checkpoint dan resume")
+    parser.add_argument('input', help="file teks, satu nomor per baris")
+    parser.add_argument('--engine', choices=sorted(ENGINES), default='chip')
+    parser.add_argument('--job', help="id job (default: nama file input); job yang sama dilanjutkan dari checkpoint")
+    parser.add_argument('--chunk-size', type=int, default=100, help="jumlah nomor per checkpoint")
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--retry-errors', action='store_true', help="proses ulang nomor yang gagal sementara di job ini")
+    parser.add_argument('--report-dir', help="simpan juga report JSON per nomor (hanya engine posh)")
+    parser.add_argument('--aggregate', metavar='OUTPUT', help="mode agregat: hanya simpan ringkasan statistik ke file JSON (engine chip)")
+    parser.add_argument('--processes', type=int, default=1, help="jumlah worker process untuk mode agregat")
+    args = parser.parse_args()
+
+    if args.aggregate:
+        with open(args.input, encoding='utf-8') as f:
+            numbers = (line.strip() for line in f if line.strip())
+            summary = run_aggregate(numbers, args.processes, args.chunk_size).summary()
+        with open(args.aggregate, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+        print(f"Ringkasan {summary['total']} nomor tersimpan di {args.aggregate}")
+        return
+
+    job_id = args.job or f"{args.engine}:{os.path.basename(args.input)}"
+    engine = ENGINES[args.engine](report_dir=args.report_dir)
+    if args.retry_errors:
+        stats = retry_errors(engine, job_id, args.chunk_size, args.workers)
+    else:
+        stats = run_batch(engine, args.input, job_id, args.chunk_size, args.workers)
+    print(f"Selesai: {stats['processed']} diproses, {stats['skipped']} dilewati, {stats['errors']} error")
+
+
+if __name__ == "__main__":
+    main()
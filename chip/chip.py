@@ -1,14 +1,65 @@
 import phonenumbers
-from phonenumbers import carrier, timezone
+from phonenumbers import carrier, geocoder
 import requests
 import json
 import sqlite3
 from datetime import datetime
 import os
+import sys
+from prefilter import PreFilter
+# modul bersama chip/posh/pytz (logging, header, write-behind, profiling, zona waktu) ada di ../shared
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'shared'))
+from write_behind import WriteBehind
+from profiling import ReportProfiler
+from timezones import time_zones_for
+from sections import Interner, json_default
+from report_model import AnalysisReport, Lokasi, Nomor, Provider, Teknis, Validasi
+
+PLANS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'plans')
+
+# kategori untuk negara tanpa tabel prefix, diturunkan dari tipe nomor libphonenumber
+TYPE_CATEGORIES = {
+    phonenumbers.PhoneNumberType.TOLL_FREE: 'Toll-Free',
+    phonenumbers.PhoneNumberType.PREMIUM_RATE: 'Premium Rate',
+    phonenumbers.PhoneNumberType.PERSONAL_NUMBER: 'Personal Number',
+    phonenumbers.PhoneNumberType.SHARED_COST: 'Shared Cost',
+    phonenumbers.PhoneNumberType.FIXED_LINE: 'Fixed Line'
+}
+
+
+HISTORY_INSERT = "INSERT INTO analysis_history VALUES (?, ?, ?, ?, ?, ?, ?)"
+
+
+class NumberingPlans:
+    """Tabel prefix per kode negara (plans/<kode_negara>.json), dimuat saat pertama dipakai."""
+
+    def __init__(self, directory=PLANS_DIR):
+        self.directory = directory
+        self.available = set()
+        if os.path.isdir(directory):
+            self.available = {int(name[:-5]) for name in os.listdir(directory)
+                              if name.endswith('.json') and name[:-5].isdigit()}
+        self.loaded = {}
+
+    def get(self, country_code):
+        if country_code not in self.available:
+            return None
+        plan = self.loaded.get(country_code)
+        if plan is None:
+            with open(os.path.join(self.directory, f'{country_code}.json'), encoding='utf-8') as f:
+                plan = self.loaded[country_code] = json.load(f)
+        return plan
+
 
 class PhoneNumberAnalyzer:
     def __init__(self):
         self.initialize_database()
+        self.prefilter = PreFilter()
+        self.plans = NumberingPlans()
+        self.history = WriteBehind('phone_analysis.db', HISTORY_INSERT)
+        # section report yang identik (provider, lokasi, validasi) dipakai bersama
+        self.sections = Interner()
+        self.profiler = ReportProfiler()
         self.apis = {
             'numverify': {
                 'url': 'http://apilayer.net/api/validate',
@@ -23,33 +74,6 @@ class PhoneNumberAnalyzer:
                 'key': 'YOUR_PHONEAPIS_KEY'
             }
         }
-        
-        #database prefix untuk provider di indonesia
-        self.provider_prefixes = {
-            '811': 'Telkomsel', '812': 'Telkomsel', '813': 'Telkomsel', '821': 'Telkomsel', '822': 'Telkomsel', '823': 'Telkomsel',
-            '851': 'Telkomsel', '852': 'Telkomsel', '853': 'Telkomsel',
-            '814': 'Indosat', '815': 'Indosat', '816': 'Indosat', '855': 'Indosat', '856': 'Indosat', '857': 'Indosat', '858': 'Indosat',
-            '817': 'XL', '818': 'XL', '819': 'XL', '859': 'XL', '877': 'XL', '878': 'XL',
-            '838': 'AXIS', '831': 'AXIS', '832': 'AXIS', '833': 'AXIS',
-            '895': 'Three', '896': 'Three', '897': 'Three', '898': 'Three', '899': 'Three',
-            '881': 'Smart', '882': 'Smart', '883': 'Smart', '884': 'Smart', '885': 'Smart', '886': 'Smart', '887': 'Smart', '888': 'Smart', '889': 'Smart'
-        }
-        
-        # database region/kota  untuk indonesia
-        self.region_prefixes = {
-            '21': 'Jakarta',
-            '22': 'Bandung',
-            '24': 'Semarang',
-            '31': 'Surabaya',
-            '61': 'Medan',
-            '62': 'Sumatra',
-            '63': 'Kalimantan',
-            '65': 'Kalimantan Timur',
-            '67': 'Maluku',
-            '71': 'Sulawesi',
-            '73': 'Sulawesi Selatan',
-            '81': 'Papua'
-        }
 
     def initialize_database(self):
         conn = sqlite3.connect('phone_analysis.db')
@@ -61,165 +85,285 @@ class PhoneNumberAnalyzer:
         conn.commit()
         conn.close()
 
-    def get_detailed_provider_info(self, prefix):
-        prefix_3 = prefix[:3]
-        prefix_4 = prefix[:4]
-        
-        provider_info = {
-            'provider_name': self.provider_prefixes.get(prefix_3, 'Unknown'),
-            'network_type': 'GSM',
-            'provider_details': {}
-        }
-        
-        # detail porvider
-        provider_details = {
-            'Telkomsel': {
-                'full_name': 'PT Telekomunikasi Selular',
-                'website': 'www.telkomsel.com',
-                'customer_service': '188',
-                'network_tech': ['2G', '3G', '4G', '5G'],
-                'founded': 1995,
-                'market_share': '46%',
-                'parent_company': 'Telkom Indonesia & Singtel'
-            },
-            'Indosat': {
-                'full_name': 'PT Indosat Ooredoo Hutchison',
-                'website': 'www.indosatooredoo.com',
-                'customer_service': '185',
-                'network_tech': ['2G', '3G', '4G'],
-                'founded': 1967,
-                'market_share': '16%',
-                'parent_company': 'Ooredoo & CK Hutchison'
-            },
-            'XL': {
-                'full_name': 'PT XL Axiata',
-                'website': 'www.xl.co.id',
-                'customer_service': '817',
-                'network_tech': ['2G', '3G', '4G'],
-                'founded': 1989,
-                'market_share': '14%',
-                'parent_company': 'Axiata Group'
-            },
-            'AXIS': {
-                'full_name': 'PT AXIS Telekom Indonesia (Now XL Axiata)',
-                'website': 'www.axis.co.id',
-                'customer_service': '838',
-                'network_tech': ['3G', '4G'],
-                'founded': 2005,
-                'market_share': '5%',
-                'parent_company': 'XL Axiata'
-            },
-            'Three': {
-                'full_name': 'PT Hutchison 3 Indonesia',
-                'website': 'www.three.co.id',
-                'customer_service': '123',
-                'network_tech': ['3G', '4G'],
-                'founded': 2007,
-                'market_share': '12%',
-                'parent_company': 'CK Hutchison Holdings'
+    def get_detailed_provider_info(self, prefix, parsed_number=None):
+        country_code = parsed_number.country_code if parsed_number is not None else 62
+        plan = self.plans.get(country_code)
+
+        if plan is None:
+            # negara tanpa tabel prefix: pakai data carrier libphonenumber
+            provider_name = carrier.name_for_number(parsed_number, 'en') if parsed_number is not None else ''
+            return {
+                'provider_name': provider_name or 'Unknown',
+                'network_type': 'GSM',
+                'provider_details': {}
             }
+
+        provider_name = plan['provider_prefixes'].get(prefix[:3], 'Unknown')
+        return {
+            'provider_name': provider_name,
+            'network_type': plan.get('network_type', 'GSM'),
+            'provider_details': plan['provider_details'].get(provider_name, {})
         }
-        
-        if provider_info['provider_name'] in provider_details:
-            provider_info['provider_details'] = provider_details[provider_info['provider_name']]
-        
-        return provider_info
 
-    def get_region_info(self, prefix):
-        for region_prefix, region in self.region_prefixes.items():
+    def get_region_info(self, prefix, parsed_number=None):
+        country_code = parsed_number.country_code if parsed_number is not None else 62
+        plan = self.plans.get(country_code)
+
+        if plan is None:
+            # negara tanpa tabel prefix: pakai data geocoder libphonenumber
+            region = geocoder.description_for_number(parsed_number, 'id') if parsed_number is not None else ''
+            return region or 'Unknown Region'
+
+        for region_prefix, region in plan['region_prefixes'].items():
             if prefix.startswith(region_prefix):
                 return region
         return 'Unknown Region'
 
-    def get_number_category(self, number):
-        if number.startswith('0800'):
-            return 'Toll-Free'
-        elif number.startswith('0899'):
-            return 'Premium Rate'
-        elif number.startswith('0878'):
-            return 'Personal Number'
-        else:
-            return 'Regular Mobile'
+    def get_number_category(self, national_number, parsed_number=None, number_type=None):
+        country_code = parsed_number.country_code if parsed_number is not None else 62
+        plan = self.plans.get(country_code)
+
+        if plan is None:
+            if number_type is None and parsed_number is not None:
+                number_type = phonenumbers.number_type(parsed_number)
+            return TYPE_CATEGORIES.get(number_type, 'Regular Mobile')
+
+        for category_prefix, category in plan['kategori'].items():
+            if national_number.startswith(category_prefix):
+                return category
+        return plan['kategori_default']
+
+    def get_country_name(self, parsed_number):
+        plan = self.plans.get(parsed_number.country_code)
+        if plan is not None:
+            return plan['negara']
+        return geocoder.country_name_for_number(parsed_number, 'id') or phonenumbers.region_code_for_number(parsed_number) or 'Unknown'
+
+    def analyze_phone_number(self, phone_number, save=True):
+        # profiling opsional untuk sebagian request (PHONE_PROFILE / PHONE_PROFILE_NUMBERS)
+        return self.profiler.run('analyze', phone_number, self._analyze_phone_number, phone_number, save)
 
-    def analyze_phone_number(self, phone_number):
+    def _analyze_phone_number(self, phone_number, save=True):
         try:
-            cleaned_number = ''.join(filter(str.isdigit, phone_number))
-            if cleaned_number.startswith('62'):
-                cleaned_number = '0' + cleaned_number[2:]
-            
+            # tolak input yang pasti tidak valid sebelum parse yang mahal
+            reason = self.prefilter.check(phone_number)
+            if reason is not None:
+                return {"error": f"Nomor telepon tidak valid: {reason}"}
+
             parsed_number = phonenumbers.parse(phone_number)
             
             if not phonenumbers.is_valid_number(parsed_number):
                 return {"error": "Nomor telepon tidak valid"}
 
             # informasi dasar
-            prefix = cleaned_number[1:4]  # Ambil 3 digit setelah '0'
-            provider_info = self.get_detailed_provider_info(prefix)
+            national_number = phonenumbers.national_significant_number(parsed_number)
+            prefix = sys.intern(national_number[:3])  # 3 digit pertama nomor nasional
+            format_nasional = phonenumbers.format_number(parsed_number, phonenumbers.PhoneNumberFormat.NATIONAL)
+            cleaned_number = ''.join(filter(str.isdigit, format_nasional))
+            provider_info = self.get_detailed_provider_info(prefix, parsed_number)
+            number_type = phonenumbers.number_type(parsed_number)
             
-            result = {
-                "nomor": {
-                    "original": phone_number,
-                    "format_nasional": phonenumbers.format_number(parsed_number, phonenumbers.PhoneNumberFormat.NATIONAL),
-                    "format_internasional": phonenumbers.format_number(parsed_number, phonenumbers.PhoneNumberFormat.INTERNATIONAL),
-                    "format_e164": phonenumbers.format_number(parsed_number, phonenumbers.PhoneNumberFormat.E164),
-                    "prefix": prefix,
-                    "nomor_bersih": cleaned_number,
-                    "kategori": self.get_number_category(cleaned_number)
-                },
-                
-                "validasi": {
-                    "valid": phonenumbers.is_valid_number(parsed_number),
-                    "kemungkinan": phonenumbers.is_possible_number(parsed_number),
-                    "tipe_nomor": self.get_number_type(parsed_number),
-                    "format_valid": True
-                },
-                
-                "provider": {
-                    "nama": provider_info['provider_name'],
-                    "network_type": provider_info['network_type'],
-                    "detail": provider_info['provider_details']
-                },
-                
-                "lokasi": {
-                    "negara": "Indonesia",
-                    "kode_negara": "+62",
-                    "region": self.get_region_info(prefix),
-                    "zona_waktu": list(timezone.time_zones_for_number(parsed_number)),
-                    "carrier_region": carrier.region_code_for_number(parsed_number)
-                },
-                
-                "teknis": {
-                    "country_code": parsed_number.country_code,
-                    "national_number": parsed_number.national_number,
-                    "number_type": phonenumbers.number_type(parsed_number),
-                    "area_code": prefix
-                }
-            }
+            result = AnalysisReport(
+                nomor=Nomor(
+                    original=phone_number,
+                    format_nasional=format_nasional,
+                    format_internasional=phonenumbers.format_number(parsed_number, phonenumbers.PhoneNumberFormat.INTERNATIONAL),
+                    format_e164=phonenumbers.format_number(parsed_number, phonenumbers.PhoneNumberFormat.E164),
+                    prefix=prefix,
+                    nomor_bersih=cleaned_number,
+                    kategori=self.get_number_category(national_number, parsed_number, number_type)
+                ),
+
+                validasi=self.sections.get(
+                    Validasi,
+                    valid=phonenumbers.is_valid_number(parsed_number),
+                    kemungkinan=phonenumbers.is_possible_number(parsed_number),
+                    tipe_nomor=self.get_number_type(parsed_number, number_type),
+                    format_valid=True
+                ),
+
+                provider=self._provider_section(parsed_number.country_code, provider_info),
+
+                lokasi=self.sections.get(
+                    Lokasi,
+                    negara=self.get_country_name(parsed_number),
+                    kode_negara=f"+{parsed_number.country_code}",
+                    region=self.get_region_info(prefix, parsed_number),
+                    zona_waktu=time_zones_for(parsed_number, number_type),
+                    carrier_region=carrier.region_code_for_number(parsed_number)
+                ),
+
+                teknis=Teknis(
+                    country_code=parsed_number.country_code,
+                    national_number=parsed_number.national_number,
+                    number_type=number_type,
+                    area_code=prefix
+                )
+            )
             
             # Simpna ke database
-            self.save_analysis(phone_number, result)
+            if save:
+                self.save_analysis(phone_number, result)
             
             return result
 
         except Exception as e:
             return {"error": f"Terjadi kesalahan: {str(e)}"}
 
-    def save_analysis(self, phone_number, result):
-        conn = sqlite3.connect('phone_analysis.db')
-        c = conn.cursor()
-        c.execute("""INSERT INTO analysis_history VALUES (?, ?, ?, ?, ?, ?, ?)""",
-                 (phone_number,
-                  datetime.now().isoformat(),
-                  result['provider']['nama'],
-                  result['lokasi']['region'],
-                  result['validasi']['valid'],
-                  result['nomor']['kategori'],
-                  json.dumps(result)))
-        conn.commit()
-        conn.close()
+    def analyze_range(self, pattern, save=False, max_width=6):
+        """Analisis satu blok nomor, mis. '+62 812 3456 xxxx', sebagai generator.
+
+        Atribut level prefix (negara, kemungkinan, carrier region) dihitung sekali untuk
+        seluruh blok, provider/region/kategori dan template format sekali per 1000 nomor;
+        per nomor hanya tipe/validitas yang dihitung. Nomor yang tidak valid dilewati.
+        Blok dibatasi `max_width` digit 'x' (10 ** max_width nomor).
+        """
+        compact = ''.join(ch for ch in pattern.lower() if ch.isdigit() or ch in '+x')
+        width = len(compact) - len(compact.rstrip('x'))
+        if not compact.startswith('+') or width == 0 or 'x' in compact[:-width]:
+            raise ValueError("Pola harus diawali '+' dan diakhiri digit 'x', mis. +62 812 3456 xxxx")
+        if width > max_width:
+            raise ValueError(f"Maksimal {max_width} digit 'x' per pola ({10 ** max_width:,} nomor)")
+
+        sample = phonenumbers.parse(compact[:-width] + '0' * width)
+        country_code = sample.country_code
+        base = phonenumbers.national_significant_number(sample)[:-width]
+
+        # panjang yang tidak mungkin untuk negara ini tidak akan menghasilkan nomor valid
+        lengths = self.prefilter.possible_lengths(country_code)
+        if lengths and len(base) + width not in lengths:
+            raise ValueError(f"Nomor +{country_code} dengan {len(base) + width} digit nasional tidak mungkin "
+                             f"(panjang yang mungkin: {', '.join(map(str, sorted(lengths)))})")
 
-    def get_number_type(self, parsed_number):
-        number_type = phonenumbers.number_type(parsed_number)
+        # atribut level prefix, sama untuk semua nomor di blok
+        has_plan = self.plans.get(country_code) is not None
+        country_name = self.get_country_name(sample)
+        kode_negara = f"+{country_code}"
+        possible = phonenumbers.is_possible_number(sample)
+        single_region = len(phonenumbers.COUNTRY_CODE_TO_REGION_CODE.get(country_code, ())) == 1
+        shared_carrier_region = carrier.region_code_for_number(sample) if single_region else None
+        formats = (phonenumbers.PhoneNumberFormat.NATIONAL, phonenumbers.PhoneNumberFormat.INTERNATIONAL)
+        blocks = {}
+
+        for i in range(10 ** width):
+            suffix = str(i).zfill(width)
+            nsn = base + suffix
+            number = phonenumbers.PhoneNumber(
+                country_code=country_code,
+                national_number=int(nsn),
+                italian_leading_zero=sample.italian_leading_zero,
+                number_of_leading_zeros=sample.number_of_leading_zeros
+            )
+            number_type = phonenumbers.number_type(number)
+            if number_type == phonenumbers.PhoneNumberType.UNKNOWN:
+                continue
+
+            # pola format dan data carrier/geocoder dipilih dari digit awal, jadi
+            # dihitung sekali per blok 1000 nomor
+            key = nsn[:max(len(base), len(nsn) - 3)]
+            block = blocks.get(key)
+            if block is None:
+                prefix = sys.intern(nsn[:3])
+                block = blocks[key] = {
+                    "prefix": prefix,
+                    "provider": self._provider_section(country_code, self.get_detailed_provider_info(prefix, number)),
+                    "region": self.get_region_info(prefix, number),
+                    "kategori": self.get_number_category(nsn, number, number_type) if has_plan else None,
+                    "templates": [self._format_template(number, fmt, width) for fmt in formats]
+                }
+            national, international = [self._apply_template(t, number, fmt, suffix)
+                                       for t, fmt in zip(block["templates"], formats)]
+            e164 = f"+{country_code}{nsn}"
+            prefix = block["prefix"]
+
+            result = AnalysisReport(
+                nomor=Nomor(
+                    original=e164,
+                    format_nasional=national,
+                    format_internasional=international,
+                    format_e164=e164,
+                    prefix=prefix,
+                    nomor_bersih=''.join(filter(str.isdigit, national)),
+                    kategori=block["kategori"] or TYPE_CATEGORIES.get(number_type, 'Regular Mobile')
+                ),
+                validasi=self.sections.get(
+                    Validasi,
+                    valid=True,
+                    kemungkinan=possible,
+                    tipe_nomor=self.get_number_type(number, number_type),
+                    format_valid=True
+                ),
+                provider=block["provider"],
+                lokasi=self.sections.get(
+                    Lokasi,
+                    negara=country_name,
+                    kode_negara=kode_negara,
+                    region=block["region"],
+                    zona_waktu=time_zones_for(number, number_type),
+                    carrier_region=shared_carrier_region or carrier.region_code_for_number(number)
+                ),
+                teknis=Teknis(
+                    country_code=country_code,
+                    national_number=number.national_number,
+                    number_type=number_type,
+                    area_code=prefix
+                )
+            )
+
+            if save:
+                self.save_analysis(e164, result)
+            yield result
+
+    def _provider_section(self, country_code, provider_info):
+        # satu objek Provider per provider, detail-nya tidak disalin ke setiap report
+        return self.sections.get(
+            Provider,
+            key=(country_code, provider_info['provider_name']),
+            nama=provider_info['provider_name'],
+            network_type=provider_info['network_type'],
+            detail=provider_info['provider_details']
+        )
+
+    @staticmethod
+    def _format_template(number, fmt, width):
+        formatted = phonenumbers.format_number(number, fmt)
+        positions = [i for i, ch in enumerate(formatted) if ch.isdigit()][-width:]
+        return (list(formatted), positions) if len(positions) == width else None
+
+    @staticmethod
+    def _apply_template(template, number, fmt, suffix):
+        if template is None:
+            return phonenumbers.format_number(number, fmt)
+        chars, positions = template
+        chars = chars[:]
+        for position, digit in zip(positions, suffix):
+            chars[position] = digit
+        return ''.join(chars)
+
+    def save_analysis(self, phone_number, result, conn=None):
+        row = (phone_number,
+               datetime.now().isoformat(),
+               result['provider']['nama'],
+               result['lokasi']['region'],
+               result['validasi']['valid'],
+               result['nomor']['kategori'],
+               json.dumps(result, default=json_default))
+
+        # jika conn diberikan, commit diserahkan ke pemanggil (mis. batch dengan checkpoint)
+        if conn is not None:
+            conn.execute(HISTORY_INSERT, row)
+            return
+
+        # selain itu baris ditulis oleh thread writer di latar belakang
+        self.history.submit(row)
+
+    def close(self):
+        # tunggu semua hasil yang masih di antrian tersimpan ke database
+        self.history.close()
+
+    def get_number_type(self, parsed_number, number_type=None):
+        if number_type is None:
+            number_type = phonenumbers.number_type(parsed_number)
         number_type_dict = {
             0: "FIXED_LINE",
             1: "MOBILE",
@@ -296,5 +440,7 @@ def main():
             print(f"National Number: {result['teknis']['national_number']}")
             print(f"Area Code: {result['teknis']['area_code']}")
 
+    analyzer.close()
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,212 @@
+import argparse
+import glob
+import json
+import os
+import sqlite3
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+# satu kolom per field hasil analyze_phone_number; string berulang (provider, region,
+# kategori, ...) disimpan sebagai dictionary sehingga tiap nilai unik hanya ditulis sekali
+DICT_STRING = pa.dictionary(pa.int32(), pa.string())
+
+COLUMNS = [
+    # (nama kolom, tipe arrow, bagian hasil, key)
+    # row_id = rowid analysis_history, penanda baris mana yang sudah diekspor
+    ('row_id', pa.int64(), None, 'row_id'),
+    ('phone_number', pa.string(), None, 'phone_number'),
+    ('timestamp', pa.timestamp('us'), None, 'timestamp'),
+    ('format_nasional', pa.string(), 'nomor', 'format_nasional'),
+    ('format_internasional', pa.string(), 'nomor', 'format_internasional'),
+    ('format_e164', pa.string(), 'nomor', 'format_e164'),
+    ('prefix', DICT_STRING, 'nomor', 'prefix'),
+    ('nomor_bersih', pa.string(), 'nomor', 'nomor_bersih'),
+    ('kategori', DICT_STRING, 'nomor', 'kategori'),
+    ('valid', pa.bool_(), 'validasi', 'valid'),
+    ('kemungkinan', pa.bool_(), 'validasi', 'kemungkinan'),
+    ('tipe_nomor', DICT_STRING, 'validasi', 'tipe_nomor'),
+    ('format_valid', pa.bool_(), 'validasi', 'format_valid'),
+    ('provider', DICT_STRING, 'provider', 'nama'),
+    ('network_type', DICT_STRING, 'provider', 'network_type'),
+    ('provider_detail', DICT_STRING, 'provider', 'detail'),
+    ('negara', DICT_STRING, 'lokasi', 'negara'),
+    ('kode_negara', DICT_STRING, 'lokasi', 'kode_negara'),
+    ('region', DICT_STRING, 'lokasi', 'region'),
+    ('zona_waktu', pa.list_(DICT_STRING), 'lokasi', 'zona_waktu'),
+    ('carrier_region', DICT_STRING, 'lokasi', 'carrier_region'),
+    ('country_code', pa.int16(), 'teknis', 'country_code'),
+    ('national_number', pa.int64(), 'teknis', 'national_number'),
+    ('number_type', pa.int8(), 'teknis', 'number_type'),
+    ('area_code', DICT_STRING, 'teknis', 'area_code'),
+]
+
+SCHEMA = pa.schema([(name, type_) for name, type_, _, _ in COLUMNS])
+
+
+def _flatten(row_id: int, phone_number: str, timestamp: str, additional_info: str) -> List[Any]:
+    result = json.loads(additional_info)
+    base = {'row_id': row_id, 'phone_number': phone_number, 'timestamp': datetime.fromisoformat(timestamp)}
+    row = []
+    for _, _, section, key in COLUMNS:
+        if section is None:
+            row.append(base[key])
+            continue
+        value = result.get(section, {}).get(key)
+        if key == 'detail':
+            # detail provider dibagi banyak nomor, cukup satu string JSON per provider
+            value = json.dumps(value, ensure_ascii=False, sort_keys=True) if value else None
+        row.append(value)
+    return row
+
+
+def _to_table(rows: List[List[Any]]) -> pa.Table:
+    columns = list(zip(*rows)) if rows else [[] for _ in COLUMNS]
+    arrays = []
+    for (name, type_, _, _), values in zip(COLUMNS, columns):
+        if pa.types.is_dictionary(type_):
+            arrays.append(pa.array(values, pa.string()).dictionary_encode())
+        elif pa.types.is_list(type_):
+            flat = pa.array(values, pa.list_(pa.string()))
+            arrays.append(pa.ListArray.from_arrays(flat.offsets, flat.values.dictionary_encode(), mask=flat.is_null()))
+        else:
+            arrays.append(pa.array(values, type_))
+    return pa.Table.from_arrays(arrays, schema=SCHEMA)
+
+
+def _parts(directory: str) -> List[str]:
+    return sorted(glob.glob(os.path.join(directory, 'part-*.parquet')))
+
+
+def last_exported(directory: str) -> Optional[int]:
+    """rowid terbesar yang sudah diekspor, dibaca dari statistik parquet (tanpa membaca data).
+
+    Penanda memakai rowid, bukan timestamp: timestamp diisi saat analisis selesai, sehingga
+    baris yang di-commit belakangan bisa punya timestamp lebih lama dari ekspor terakhir.
+    """
+    latest = None
+    for path in _parts(directory):
+        metadata = pq.ParquetFile(path).metadata
+        column = metadata.schema.names.index('row_id')
+        for i in range(metadata.num_row_groups):
+            stats = metadata.row_group(i).column(column).statistics
+            if stats is not None and stats.has_min_max and (latest is None or stats.max > latest):
+                latest = stats.max
+    return latest
+
+
+def _read_history(db_path: str, since: Optional[int], chunk_size: int) -> Iterator[List[List[Any]]]:
+    conn = sqlite3.connect(db_path)
+    try:
+        cursor = conn.execute(
+            "SELECT rowid, phone_number, timestamp, additional_info FROM analysis_history "
+            "WHERE rowid > ? ORDER BY rowid",
+            (since or 0,)
+        )
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield [_flatten(*row) for row in rows]
+    finally:
+        conn.close()
+
+
+def _write_part(directory: str, table: pa.Table, row_group_size: int, name: str = None) -> str:
+    if name is None:
+        name = f"part-{pc.min(table.column('row_id')).as_py():012d}.parquet"
+    path = os.path.join(directory, name)
+    # file sementara diawali titik agar tidak ikut terbaca sebagai bagian dataset
+    tmp_path = os.path.join(directory, f'.{name}.tmp')
+    pq.write_table(table, tmp_path, row_group_size=row_group_size, compression='zstd')
+    os.replace(tmp_path, path)
+    return path
+
+
+def _dedupe(table: pa.Table) -> pa.Table:
+    # row_id ganda hanya muncul jika compact terhenti sebelum part lama terhapus
+    import numpy as np
+
+    row_ids = table.column('row_id').to_numpy()
+    _, first = np.unique(row_ids, return_index=True)
+    if len(first) == len(row_ids):
+        return table
+    return table.take(pa.array(np.sort(first)))
+
+
+def export_history(db_path: str, directory: str, chunk_size: int = 100000,
+                   rows_per_file: int = 1000000) -> Dict[str, Any]:
+    """Tambahkan baris analysis_history yang belum diekspor (rowid > ekspor terakhir) sebagai file parquet baru."""
+    os.makedirs(directory, exist_ok=True)
+    since = last_exported(directory)
+    written: List[str] = []
+    batches: List[pa.Table] = []
+    pending = 0
+    total = 0
+
+    for rows in _read_history(db_path, since, chunk_size):
+        batches.append(_to_table(rows))
+        pending += len(rows)
+        total += len(rows)
+        if pending >= rows_per_file:
+            written.append(_write_part(directory, pa.concat_tables(batches).unify_dictionaries(), chunk_size))
+            batches, pending = [], 0
+    if batches:
+        written.append(_write_part(directory, pa.concat_tables(batches).unify_dictionaries(), chunk_size))
+
+    return {"rows": total, "since": since, "files": written}
+
+
+def compact(directory: str, row_group_size: int = 100000) -> Optional[str]:
+    """Gabungkan semua file part menjadi satu file terurut timestamp.
+
+    File gabungan ditulis dengan nama baru (rentang row_id), baru setelah itu part lama
+    dihapus. Jika proses terhenti di antaranya, baris ganda diabaikan oleh load_history
+    dan dibersihkan oleh compact berikutnya.
+    """
+    parts = _parts(directory)
+    if len(parts) < 2:
+        return parts[0] if parts else None
+    table = pa.concat_tables([pq.read_table(path, schema=SCHEMA) for path in parts]).unify_dictionaries()
+    table = _dedupe(table).sort_by('timestamp')
+    row_ids = table.column('row_id')
+    name = f"part-{pc.min(row_ids).as_py():012d}-{pc.max(row_ids).as_py():012d}.parquet"
+    path = _write_part(directory, table, row_group_size, name)
+    for old in parts:
+        if old != path:
+            os.remove(old)
+    return path
+
+
+def load_history(directory: str, columns: List[str] = None):
+    """Baca hasil ekspor sebagai pandas DataFrame; string dictionary menjadi kolom category."""
+    read_columns = None if columns is None else list(dict.fromkeys(['row_id', *columns]))
+    table = _dedupe(pq.read_table(directory, columns=read_columns, schema=SCHEMA))
+    if columns is not None and 'row_id' not in columns:
+        table = table.drop(['row_id'])
+    return table.to_pandas()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ekspor analysis_history ke parquet (kolom bertipe, append per timestamp)")
+    parser.add_argument('output', help="direktori dataset parquet")
+    parser.add_argument('--db', default='phone_analysis.db')
+    parser.add_argument('--chunk-size', type=int, default=100000, help="jumlah baris per baca dan per row group")
+    parser.add_argument('--rows-per-file', type=int, default=1000000)
+    parser.add_argument('--compact', action='store_true', help="gabungkan semua file part setelah ekspor")
+    args = parser.parse_args()
+
+    stats = export_history(args.db, args.output, args.chunk_size, args.rows_per_file)
+    print(f"{stats['rows']} baris baru diekspor ke {args.output}" +
+          (f" (setelah rowid {stats['since']})" if stats['since'] else ""))
+    if args.compact:
+        path = compact(args.output, args.chunk_size)
+        if path:
+            print(f"Dataset digabung menjadi {path}")
+
+
+if __name__ == "__main__":
+    main()
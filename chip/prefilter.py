@@ -0,0 +1,180 @@
+import re
+from collections import Counter
+from typing import Dict, FrozenSet, Iterable, Iterator, Optional, Tuple
+
+import phonenumbers
+from phonenumbers import PhoneMetadata
+
+try:
+    from re import _parser as sre_parse
+    from re import _constants as sre_constants
+except ImportError:
+    import sre_parse
+    import sre_constants
+
+# input "polos": hanya digit, '+', spasi dan pemisah umum. Input lain (huruf vanity,
+# ekstensi, digit non-ASCII) tidak diputuskan di sini dan tetap lewat ke phonenumbers.parse
+PLAIN_INPUT = re.compile(r'[0-9\s+\-.()/]*')
+DIGITS = frozenset('0123456789')
+
+
+def _first_digits(items) -> Tuple[Optional[set], bool]:
+    """Himpunan digit pertama yang mungkin untuk sebuah regex (hasil sre_parse).
+
+    Mengembalikan (digits, nullable); digits None berarti tidak bisa ditentukan.
+    """
+    result = set()
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            result.add(chr(av))
+            return result, False
+        if op is sre_constants.IN:
+            for in_op, in_av in av:
+                if in_op is sre_constants.LITERAL:
+                    result.add(chr(in_av))
+                elif in_op is sre_constants.RANGE:
+                    result.update(chr(c) for c in range(in_av[0], in_av[1] + 1))
+                elif in_op is sre_constants.CATEGORY and in_av is sre_constants.CATEGORY_DIGIT:
+                    result.update(DIGITS)
+                else:
+                    return None, False
+            return result, False
+        if op is sre_constants.BRANCH:
+            nullable = False
+            for branch in av[1]:
+                digits, branch_nullable = _first_digits(branch)
+                if digits is None:
+                    return None, False
+                result |= digits
+                nullable = nullable or branch_nullable
+            if not nullable:
+                return result, False
+            continue
+        if op is sre_constants.SUBPATTERN:
+            digits, nullable = _first_digits(av[-1])
+        elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+            digits, nullable = _first_digits(av[2])
+            nullable = nullable or av[0] == 0
+        else:
+            return None, False
+        if digits is None:
+            return None, False
+        result |= digits
+        if not nullable:
+            return result, False
+    return result, True
+
+
+def _leading_digits(pattern: str) -> FrozenSet[str]:
+    try:
+        digits, nullable = _first_digits(sre_parse.parse(pattern))
+    except Exception:
+        digits, nullable = None, False
+    if digits is None or nullable:
+        return DIGITS
+    return frozenset(digits)
+
+
+class PreFilter:
+    """Penyaring murah sebelum phonenumbers.parse.
+
+    Aturan per kode negara (panjang nomor nasional yang mungkin, digit awal yang
+    mungkin, prefix nasional) dihitung sekali dari metadata phonenumbers saat kode
+    negara itu pertama kali muncul. Hanya input yang pasti tidak valid yang ditolak.
+    """
+
+    def __init__(self):
+        self.rules: Dict[int, Optional[Tuple[FrozenSet[int], FrozenSet[str], tuple]]] = {}
+        self.rejected = Counter()
+        self.accepted = 0
+
+    def _rules_for(self, country_code: int):
+        if country_code in self.rules:
+            return self.rules[country_code]
+
+        regions = phonenumbers.COUNTRY_CODE_TO_REGION_CODE.get(country_code)
+        metadata = []
+        for region in regions or ():
+            if region == phonenumbers.REGION_CODE_FOR_NON_GEO_ENTITY:
+                meta = PhoneMetadata.metadata_for_nongeo_region(country_code)
+            else:
+                meta = PhoneMetadata.metadata_for_region(region)
+            if meta is not None and meta.general_desc is not None:
+                metadata.append(meta)
+
+        rule = None
+        if metadata:
+            lengths = frozenset(
+                length for meta in metadata for length in (meta.general_desc.possible_length or ())
+            )
+            leading = frozenset().union(*(
+                _leading_digits(meta.general_desc.national_number_pattern or r'\d') for meta in metadata
+            ))
+            # aturan strip/transformasi prefix nasional yang sama dengan yang dipakai parse
+            prefix_rules = tuple({
+                (meta.national_prefix_for_parsing or re.escape(meta.national_prefix), meta.national_prefix_transform_rule)
+                for meta in metadata if meta.national_prefix_for_parsing or meta.national_prefix
+            })
+            rule = (lengths, leading, tuple((re.compile(p), t) for p, t in prefix_rules))
+        self.rules[country_code] = rule
+        return rule
+
+    def possible_lengths(self, country_code: int) -> FrozenSet[int]:
+        """Panjang nomor nasional yang mungkin untuk kode negara; kosong jika tidak diketahui."""
+        rule = self._rules_for(country_code)
+        return rule[0] if rule is not None else frozenset()
+
+    def check(self, phone_number: str) -> Optional[str]:
+        """Mengembalikan alasan penolakan, atau None jika input harus diteruskan ke parse."""
+        reason = self._reject_reason(phone_number)
+        if reason is None:
+            self.accepted += 1
+        else:
+            self.rejected[reason] += 1
+        return reason
+
+    def _reject_reason(self, phone_number: str) -> Optional[str]:
+        if not isinstance(phone_number, str) or not PLAIN_INPUT.fullmatch(phone_number):
+            return None
+
+        stripped = phone_number.strip()
+        digits = ''.join(filter(str.isdigit, stripped))
+        if not digits:
+            return 'kosong'
+        if not stripped.startswith('+'):
+            return 'tanpa_kode_negara'
+
+        for size in (1, 2, 3):
+            country_code = int(digits[:size])
+            if country_code in phonenumbers.COUNTRY_CODE_TO_REGION_CODE:
+                break
+        else:
+            return 'kode_negara_tidak_dikenal'
+
+        rule = self._rules_for(country_code)
+        if rule is None:
+            return None
+        lengths, leading, prefix_rules = rule
+
+        national = digits[size:]
+        candidates = [national]
+        for prefix_pattern, transform_rule in prefix_rules:
+            match = prefix_pattern.match(national)
+            if match:
+                candidates.append(national[match.end():])
+                if transform_rule:
+                    candidates.append(match.expand(transform_rule) + national[match.end():])
+
+        if not any(len(candidate) in lengths for candidate in candidates):
+            return 'panjang_tidak_mungkin'
+        if not any(candidate[:1] in leading for candidate in candidates if len(candidate) in lengths):
+            return 'prefix_tidak_mungkin'
+        return None
+
+    def filter_many(self, phone_numbers: Iterable[str]) -> Iterator[str]:
+        for phone_number in phone_numbers:
+            if self.check(phone_number) is None:
+                yield phone_number
+
+    def stats(self) -> Dict[str, int]:
+        return {"diterima": self.accepted, **self.rejected}
@@ -0,0 +1,60 @@
+import os
+import sys
+import tracemalloc
+from typing import Dict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'shared'))
+from sections import Section
+
+
+class Nomor(Section):
+    __slots__ = ('original', 'format_nasional', 'format_internasional', 'format_e164',
+                 'prefix', 'nomor_bersih', 'kategori')
+
+
+class Validasi(Section):
+    __slots__ = ('valid', 'kemungkinan', 'tipe_nomor', 'format_valid')
+
+
+class Provider(Section):
+    __slots__ = ('nama', 'network_type', 'detail')
+
+
+class Lokasi(Section):
+    __slots__ = ('negara', 'kode_negara', 'region', 'zona_waktu', 'carrier_region')
+
+
+class Teknis(Section):
+    __slots__ = ('country_code', 'national_number', 'number_type', 'area_code')
+
+
+class AnalysisReport(Section):
+    __slots__ = ('nomor', 'validasi', 'provider', 'lokasi', 'teknis')
+
+
+def _measure(build) -> int:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    reports = build()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return used // max(1, len(reports))
+
+
+def benchmark(pattern: str = '+62 812 3456 xxxx') -> Dict[str, int]:
+    """Memori per report yang ditahan di list: objek slotted vs dict bertingkat."""
+    from chip import PhoneNumberAnalyzer
+
+    analyzer = PhoneNumberAnalyzer()
+    numbers = [report['nomor']['format_e164'] for report in analyzer.analyze_range(pattern)]
+    # dict bertingkat seperti sebelumnya (detail provider dan zona waktu tetap dibagi)
+    dict_bytes = _measure(lambda: [analyzer.analyze_phone_number(n, save=False).to_dict() for n in numbers])
+    slotted_bytes = _measure(lambda: [analyzer.analyze_phone_number(n, save=False) for n in numbers])
+    return {"reports": len(numbers), "dict_bytes": dict_bytes, "slotted_bytes": slotted_bytes}
+
+
+if __name__ == "__main__":
+    result = benchmark(sys.argv[1] if len(sys.argv) > 1 else '+62 812 3456 xxxx')
+    print(f"Report          : {result['reports']:,}")
+    print(f"Dict (byte)     : {result['dict_bytes']:,} per report")
+    print(f"Slotted (byte)  : {result['slotted_bytes']:,} per report")
@@ -0,0 +1,67 @@
+import json
+from typing import Any, Dict, Optional
+
+from sections import Interner, Section, json_default
+
+# cache section bersama per proses (server/batch berjalan lama)
+SECTION_CACHE_SIZE = 4096
+
+
+# section report posh2
+class InformasiDasar(Section):
+    __slots__ = ('format_internasional', 'format_nasional', 'format_e164', 'kode_negara',
+                 'nomor_nasional', 'tipe', 'valid', 'kemungkinan')
+
+
+class Lokasi(Section):
+    __slots__ = ('country', 'region', 'city', 'coordinates', 'timezone_details', 'area_details',
+                 'demographics', 'isp_coverage')
+
+
+class Operator(Section):
+    __slots__ = ('name', 'type', 'network_type', 'portability', 'coverage_details', 'technology')
+
+
+class JejakDigital(Section):
+    __slots__ = ('social_media', 'messaging_apps', 'online_services', 'public_records',
+                 'websites_mentioned', 'apps_associated', 'last_seen_online', 'activity_score')
+
+
+class Jaringan(Section):
+    __slots__ = ('carrier', 'network_type', 'infrastructure', 'capabilities', 'coverage', 'known_issues')
+
+
+# section report posh1
+class InformasiRingkas(Section):
+    __slots__ = ('format_internasional', 'format_nasional', 'format_e164', 'kode_negara',
+                 'nomor_nasional', 'tipe')
+
+
+class LokasiRingkas(Section):
+    __slots__ = ('country', 'region', 'coordinates')
+
+
+class OperatorRingkas(Section):
+    __slots__ = ('provider', 'tipe_jaringan')
+
+
+class ZonaWaktu(Section):
+    __slots__ = ('zona_waktu', 'waktu_lokal')
+
+
+def content_key(fields: Dict[str, Any]) -> str:
+    # key interning untuk section yang berisi dict/list (tidak hashable)
+    return json.dumps(fields, sort_keys=True, ensure_ascii=False, default=json_default)
+
+
+def slotted(cls, fields: Dict[str, Any], interner: Optional[Interner] = None):
+    """Section slotted dari dict hasil getter, dibagi lewat interner jika diberikan.
+
+    Dict dikembalikan apa adanya jika key-nya tidak sama dengan slot (mis. parser upstream
+    menambah field), jadi isi report tidak pernah hilang.
+    """
+    if set(fields) != set(cls.__slots__):
+        return fields
+    if interner is None:
+        return cls(**fields)
+    return interner.get(cls, content_key(fields), **fields)
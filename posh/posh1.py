@@ -1,30 +1,51 @@
 import phonenumbers
-from phonenumbers import geocoder, carrier, timezone
+from phonenumbers import geocoder, carrier
 import requests
 import json
 from datetime import datetime
 import pytz
-from typing import Dict, Any
+from typing import Dict, Any, List
+from collections.abc import Mapping
 from rich.console import Console
 from rich.table import Table
 import folium
 import logging
+import time
 import os
-from fake_useragent import UserAgent
+import sys
+# modul bersama chip/posh/pytz (logging, header, write-behind, profiling, zona waktu) ada di ../shared
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'shared'))
+from headers import default_pool
 from bs4 import BeautifulSoup
+from osint_log import start_logging, log_fields
+from timezones import time_zones_for, get_tz, LocalTime
+from singleflight import SingleFlight
+from profiling import ReportProfiler
+from sections import Interner, json_default
+from intel_model import SECTION_CACHE_SIZE, InformasiRingkas, LokasiRingkas, OperatorRingkas, ZonaWaktu, slotted
 
 class PhoneIntelligence:
     def __init__(self):
         self.setup_logging()
         self.console = Console()
-        self.ua = UserAgent()
+        self.headers = default_pool()
+        self.single_flight = SingleFlight()
+        self.profiler = ReportProfiler()
+        self.sections = Interner(SECTION_CACHE_SIZE)
         
     def setup_logging(self):
-        logging.basicConfig(
-            filename='phone_osint.log',
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s'
-        )
+        # logging lewat antrian, file ditulis oleh thread latar belakang dengan rotasi
+        start_logging('phone_osint.log', level=logging.INFO)
+
+    def _get(self, url: str, **kwargs):
+        # request paralel ke URL yang sama (mis. query Nominatim per negara) berbagi satu response
+        kwargs.setdefault('timeout', 5)
+
+        def fetch():
+            response = requests.get(url, headers=self.headers.next(), **kwargs)
+            response.content
+            return response
+        return self.single_flight.do(('url', url), fetch)
 
     def search_number_reputation(self, number: str) -> Dict[str, Any]:
         results = {
@@ -39,11 +60,9 @@ class PhoneIntelligence:
             "scam": f"https://scam.directory/api/v1/phone/{number}"
         }
         
-        headers = {'User-Agent': self.ua.random}
-        
         for source, url in apis.items():
             try:
-                response = requests.get(url, headers=headers, timeout=5)
+                response = self._get(url, timeout=5)
                 if response.status_code == 200:
                     data = response.json()
                     if source == "truecaller" and "score" in data:
@@ -66,7 +85,7 @@ class PhoneIntelligence:
         }
         
         results = {}
-        headers = {'User-Agent': self.ua.random}
+        headers = self.headers.next()
         
         for platform, url in platforms.items():
             try:
@@ -89,7 +108,7 @@ class PhoneIntelligence:
         
         try:
             geocoding_url = f"https://nominatim.openstreetmap.org/search?country={country}&format=json"
-            response = requests.get(geocoding_url, headers={'User-Agent': self.ua.random})
+            response = self._get(geocoding_url)
             if response.status_code == 200 and response.json():
                 data = response.json()[0]
                 location["coordinates"] = {
@@ -101,67 +120,95 @@ class PhoneIntelligence:
             
         return location
 
-    def generate_report(self, phone_number: str) -> Dict[str, Any]:
+    def generate_report(self, phone_number: str, clock: datetime = None) -> Dict[str, Any]:
+        # profiling opsional untuk sebagian request (PHONE_PROFILE / PHONE_PROFILE_NUMBERS)
+        return self.profiler.run('report', phone_number, self._generate_report, phone_number, clock)
+
+    def _generate_report(self, phone_number: str, clock: datetime = None) -> Dict[str, Any]:
+        clock = clock or datetime.now(pytz.utc)
+        started = time.perf_counter()
         try:
             parsed = phonenumbers.parse(phone_number)
             if not phonenumbers.is_valid_number(parsed):
                 raise ValueError("Nomor telepon tidak valid")
-
-            basic_info = {
-                "format_internasional": phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.INTERNATIONAL),
-                "format_nasional": phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.NATIONAL),
-                "format_e164": phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.E164),
-                "kode_negara": f"+{parsed.country_code}",
-                "nomor_nasional": parsed.national_number,
-                "tipe": str(phonenumbers.number_type(parsed)).split('.')[-1]
-            }
-
-            location = self.get_location_info(parsed)
-
-            carrier_info = {
-                "provider": carrier.name_for_number(parsed, "id"),
-                "tipe_jaringan": basic_info["tipe"]
-            }
-
-            tz_list = timezone.time_zones_for_number(parsed)
-            timezone_info = {
-                "zona_waktu": tz_list[0] if tz_list else "Unknown",
-                "waktu_lokal": datetime.now(pytz.timezone(tz_list[0])).strftime("%Y-%m-%d %H:%M:%S") if tz_list else "Unknown"
-            }
-
-            reputation = self.search_number_reputation(phone_number)
-            social_media = self.check_social_media(phone_number)
-
-            report = {
-                "informasi_dasar": basic_info,
-                "lokasi": location,
-                "operator": carrier_info,
-                "zona_waktu": timezone_info,
-                "reputasi": reputation,
-                "media_sosial": social_media,
-                "waktu_analisis": datetime.now().isoformat()
-            }
-
-            if location["coordinates"]:
-                m = folium.Map(
-                    location=[location["coordinates"]["latitude"], location["coordinates"]["longitude"]],
-                    zoom_start=10
-                )
-                folium.Marker(
-                    [location["coordinates"]["latitude"], location["coordinates"]["longitude"]],
-                    popup=basic_info["format_internasional"]
-                ).add_to(m)
-                m.save('lokasi_nomor.html')
-
-            return report
+            # request paralel untuk nomor E.164 yang sama berbagi satu analisis
+            key = ('report', phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.E164))
+            return self.single_flight.do(key, self._build_report, phone_number, parsed, clock)
 
         except Exception as e:
-            logging.error(f"Error analyzing number {phone_number}: {str(e)}")
+            logging.error(f"Error analyzing number: {str(e)}", extra=log_fields(phone_number, 'report', started))
             raise
 
+    def _build_report(self, phone_number: str, parsed, clock: datetime) -> Dict[str, Any]:
+        number_type = phonenumbers.number_type(parsed)
+
+        basic_info = InformasiRingkas(
+            format_internasional=phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.INTERNATIONAL),
+            format_nasional=phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.NATIONAL),
+            format_e164=phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.E164),
+            kode_negara=f"+{parsed.country_code}",
+            nomor_nasional=parsed.national_number,
+            tipe=str(number_type).split('.')[-1]
+        )
+
+        # lokasi, operator dan zona waktu dibagi antar report yang isinya sama
+        location = slotted(LokasiRingkas, self.get_location_info(parsed), self.sections)
+
+        carrier_info = self.sections.get(
+            OperatorRingkas,
+            provider=carrier.name_for_number(parsed, "id"),
+            tipe_jaringan=basic_info["tipe"]
+        )
+
+        tz_list = time_zones_for(parsed, number_type)
+        tz_name = tz_list[0] if tz_list else "Unknown"
+        # satu jam per batch (generate_reports), jadi waktu lokal sama untuk zona yang sama
+        timezone_info = self.sections.get(
+            ZonaWaktu, (tz_name, clock),
+            zona_waktu=tz_name,
+            waktu_lokal=LocalTime(get_tz(tz_name), clock) if tz_list else "Unknown"
+        )
+
+        reputation = self.search_number_reputation(phone_number)
+        social_media = self.check_social_media(phone_number)
+
+        report = {
+            "informasi_dasar": basic_info,
+            "lokasi": location,
+            "operator": carrier_info,
+            "zona_waktu": timezone_info,
+            "reputasi": reputation,
+            "media_sosial": social_media,
+            "waktu_analisis": clock.astimezone().replace(tzinfo=None).isoformat()
+        }
+
+        if location["coordinates"]:
+            m = folium.Map(
+                location=[location["coordinates"]["latitude"], location["coordinates"]["longitude"]],
+                zoom_start=10
+            )
+            folium.Marker(
+                [location["coordinates"]["latitude"], location["coordinates"]["longitude"]],
+                popup=basic_info["format_internasional"]
+            ).add_to(m)
+            m.save('lokasi_nomor.html')
+
+        return report
+
+    def generate_reports(self, phone_numbers: List[str]) -> List[Dict[str, Any]]:
+        # satu pembacaan jam untuk seluruh batch
+        clock = datetime.now(pytz.utc)
+        reports = []
+        for phone_number in phone_numbers:
+            try:
+                reports.append(self.generate_report(phone_number, clock))
+            except Exception as e:
+                reports.append({"nomor": phone_number, "error": str(e)})
+        return reports
+
     def display_report(self, report: Dict[str, Any]):
         for section, data in report.items():
-            if isinstance(data, dict):
+            if isinstance(data, Mapping):
                 table = Table(title=section.replace('_', ' ').title())
                 table.add_column("Field", style="cyan")
                 table.add_column("Value", style="green")
@@ -196,7 +243,7 @@ def main():
                 analyzer.display_report(report)
                 
                 with open(f'report_{phone}.json', 'w', encoding='utf-8') as f:
-                    json.dump(report, f, indent=2, ensure_ascii=False)
+                    json.dump(report, f, indent=2, ensure_ascii=False, default=json_default)
                 console.print(f"\n[green]Report tersimpan di report_{phone}.json[/green]")
 
         except Exception as e:
@@ -1,16 +1,22 @@
 import phonenumbers
 from phonenumbers import geocoder, carrier, timezone
 import requests
+from requests.adapters import HTTPAdapter
 import json
 from datetime import datetime
 import pytz
 from typing import Dict, Any, List
+from collections.abc import Mapping
 from rich.console import Console
 from rich.table import Table
 import folium
 import logging
+import time
 import os
-from fake_useragent import UserAgent
+import sys
+# modul bersama chip/posh/pytz (logging, header, write-behind, profiling, zona waktu) ada di ../shared
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'shared'))
+from headers import default_pool
 from bs4 import BeautifulSoup
 import re
 import shodan
@@ -21,20 +27,51 @@ import ipwhois
 from email_validator import validate_email
 from urllib.parse import urlparse
 import pandas as pd
+from security_db import SecurityDatabase, number_key
+from risk_engine import RiskEngine
+from singleflight import SingleFlight
+from osint_log import start_logging, log_fields
+from write_behind import WriteBehind
+from scheduler import Scheduler, INTERACTIVE
+from profiling import ReportProfiler
+from sections import Interner, json_default
+from intel_model import (SECTION_CACHE_SIZE, InformasiDasar, Jaringan, JejakDigital, Lokasi, Operator,
+                         slotted)
+
+REPORT_SCHEMA = '''CREATE TABLE IF NOT EXISTS phone_records (
+                    phone_number TEXT PRIMARY KEY,
+                    analysis_data TEXT,
+                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+                )'''
+REPORT_INSERT = ("INSERT OR REPLACE INTO phone_records (phone_number, analysis_data, timestamp) "
+                 "VALUES (?, ?, CURRENT_TIMESTAMP)")
+
+
+class UpstreamError(Exception):
+    """Sumber eksternal gagal sementara (HTTP 5xx / 429)."""
+
+
+# kegagalan fetch yang membuat isi section tidak bisa dipercaya (bukan "data memang kosong")
+UPSTREAM_ERRORS = (requests.RequestException, UpstreamError)
 
 class PhoneIntelligence:
     def __init__(self):
         self.setup_logging()
         self.console = Console()
-        self.ua = UserAgent()
+        self.headers = default_pool()
         self.setup_apis()
+        self.setup_session()
+        self.scheduler = Scheduler(http_slots=self.pool_size)
+        self.single_flight = SingleFlight()
+        self.profiler = ReportProfiler()
+        self.sections = Interner(SECTION_CACHE_SIZE)
+        self.security_db = SecurityDatabase()
+        self.risk_engine = RiskEngine()
+        self.records = WriteBehind('phone_intel.db', REPORT_INSERT, schema=REPORT_SCHEMA)
         
     def setup_logging(self):
-        logging.basicConfig(
-            filename='phone_osint.log',
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s'
-        )
+        # logging lewat antrian, file ditulis oleh thread latar belakang dengan rotasi
+        start_logging('phone_osint.log', level=logging.INFO)
         
     def setup_apis(self):
         self.apis = {
@@ -44,6 +81,28 @@ class PhoneIntelligence:
             'hibp': os.getenv('HIBP_API_KEY')
         }
 
+    def setup_session(self, pool_size: int = 32, timeout: float = None):
+        # satu session dengan connection pool, dipakai ulang oleh semua request. timeout wajib:
+        # upstream yang menggantung tidak boleh memegang slot HTTP dan key single-flight selamanya
+        self.pool_size = pool_size
+        self.timeout = timeout if timeout is not None else float(os.getenv('PHONE_HTTP_TIMEOUT', '5'))
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def _get(self, url: str):
+        # request paralel ke URL yang sama (mis. query Nominatim per negara) berbagi satu response
+        def fetch():
+            # slot HTTP keluar dibagi per kelas prioritas request yang sedang berjalan
+            with self.scheduler.http.slot():
+                response = self.session.get(url, headers=self.headers.next(), timeout=self.timeout)
+                response.content
+            if response.status_code == 429 or response.status_code >= 500:
+                raise UpstreamError(f"HTTP {response.status_code} dari {urlparse(url).netloc}")
+            return response
+        return self.single_flight.do(('url', url), fetch)
+
     def get_deep_carrier_info(self, number: str, parsed) -> Dict[str, Any]:
         carrier_info = {
             "name": carrier.name_for_number(parsed, "id"),
@@ -54,23 +113,28 @@ class PhoneIntelligence:
             "technology": []
         }
         
+        started = time.perf_counter()
         try:
             mcc = str(parsed.country_code)
             mnc = str(parsed.national_number)[:3]
 
             carrier_db_url = f"https://mcc-mnc-list.com/list/{mcc}-{mnc}"
-            response = requests.get(carrier_db_url, headers={'User-Agent': self.ua.random})
+            response = self._get(carrier_db_url)
             if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                carrier_info.update(self._parse_carrier_details(soup))
+                # parsing HTML memakai slot CPU, request HTTP di atas hanya slot HTTP
+                with self.scheduler.cpu.slot():
+                    soup = BeautifulSoup(response.text, 'html.parser')
+                    carrier_info.update(self._parse_carrier_details(soup))
 
             port_check_url = f"https://numverify.com/portability/{number}"
-            response = requests.get(port_check_url, headers={'User-Agent': self.ua.random})
+            response = self._get(port_check_url)
             if response.status_code == 200:
                 carrier_info["portability"] = "Ported" if "ported" in response.text.lower() else "Original"
                 
+        except UPSTREAM_ERRORS as e:
+            carrier_info["error"] = self._upstream_failed(number, 'carrier', e, started)
         except Exception as e:
-            logging.error(f"Error getting carrier info: {str(e)}")
+            logging.error(f"Error getting carrier info: {str(e)}", extra=log_fields(number, 'carrier', started))
             
         return carrier_info
 
@@ -89,9 +153,10 @@ class PhoneIntelligence:
             "isp_coverage": []
         }
         
+        started = time.perf_counter()
         try:
             geocoding_url = f"https://nominatim.openstreetmap.org/search?country={country}&format=json"
-            response = requests.get(geocoding_url, headers={'User-Agent': self.ua.random})
+            response = self._get(geocoding_url)
             if response.status_code == 200 and response.json():
                 data = response.json()[0]
                 location.update(self._parse_location_data(data))
@@ -99,8 +164,10 @@ class PhoneIntelligence:
             if location["coordinates"]:
                 self._enrich_location_data(location)
                 
+        except UPSTREAM_ERRORS as e:
+            location["error"] = self._upstream_failed(parsed_number, 'location', e, started)
         except Exception as e:
-            logging.error(f"Error getting location details: {str(e)}")
+            logging.error(f"Error getting location details: {str(e)}", extra=log_fields(parsed_number, 'location', started))
             
         return location
 
@@ -116,19 +183,30 @@ class PhoneIntelligence:
             "security_recommendations": []
         }
         
+        started = time.perf_counter()
         try:
+            number_type = phonenumbers.number_type(phonenumbers.parse(number))
+            security_info["number_type"] = number_type
+            security_info["voip_detection"] = number_type == phonenumbers.PhoneNumberType.VOIP
+
             security_info.update(self._check_security_databases(number))
 
             security_info.update(self._check_dark_web(number))
 
             security_info.update(self._analyze_scam_patterns(number))
+
+            try:
+                security_info.update(self._check_reputation(number))
+            except UPSTREAM_ERRORS as e:
+                # skor tetap dihitung tanpa trust_score, section ditandai tidak lengkap
+                security_info["error"] = self._upstream_failed(number, 'reputation', e, started)
             
             security_info["risk_score"] = self._calculate_risk_score(security_info)
             
             security_info["security_recommendations"] = self._generate_security_recommendations(security_info)
             
         except Exception as e:
-            logging.error(f"Error checking security: {str(e)}")
+            logging.error(f"Error checking security: {str(e)}", extra=log_fields(number, 'security', started))
             
         return security_info
 
@@ -144,6 +222,7 @@ class PhoneIntelligence:
             "activity_score": 0
         }
         
+        started = time.perf_counter()
         try:
             platforms = [
                 'facebook', 'instagram', 'twitter', 'linkedin', 'telegram',
@@ -165,7 +244,7 @@ class PhoneIntelligence:
             footprint["activity_score"] = self._calculate_activity_score(footprint)
             
         except Exception as e:
-            logging.error(f"Error analyzing digital footprint: {str(e)}")
+            logging.error(f"Error analyzing digital footprint: {str(e)}", extra=log_fields(number, 'footprint', started))
             
         return footprint
 
@@ -179,6 +258,7 @@ class PhoneIntelligence:
             "known_issues": []
         }
         
+        started = time.perf_counter()
         try:
             carrier_name = network_info["carrier"]
             if carrier_name:
@@ -189,44 +269,89 @@ class PhoneIntelligence:
             network_info["coverage"] = self._get_coverage_info(parsed_number)
             
         except Exception as e:
-            logging.error(f"Error getting network details: {str(e)}")
+            logging.error(f"Error getting network details: {str(e)}", extra=log_fields(parsed_number, 'network', started))
             
         return network_info
 
-    def generate_report(self, phone_number: str) -> Dict[str, Any]:
+    def generate_report(self, phone_number: str, priority: str = INTERACTIVE) -> Dict[str, Any]:
+        # profiling opsional untuk sebagian request (PHONE_PROFILE / PHONE_PROFILE_NUMBERS)
+        return self.profiler.run('report', phone_number, self._generate_report, phone_number, priority)
+
+    def _generate_report(self, phone_number: str, priority: str = INTERACTIVE) -> Dict[str, Any]:
+        started = time.perf_counter()
         try:
             parsed = phonenumbers.parse(phone_number)
             if not phonenumbers.is_valid_number(parsed):
                 raise ValueError("Nomor telepon tidak valid")
 
-            basic_info = {
-                "format_internasional": phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.INTERNATIONAL),
-                "format_nasional": phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.NATIONAL),
-                "format_e164": phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.E164),
-                "kode_negara": f"+{parsed.country_code}",
-                "nomor_nasional": parsed.national_number,
-                "tipe": str(phonenumbers.number_type(parsed)).split('.')[-1],
-                "valid": phonenumbers.is_valid_number(parsed),
-                "kemungkinan": phonenumbers.is_possible_number(parsed)
-            }
-
-            report = {
-                "informasi_dasar": basic_info,
-                "lokasi": self.get_location_details(parsed),
-                "operator": self.get_deep_carrier_info(phone_number, parsed),
-                "keamanan": self.check_number_security(phone_number),
-                "jejak_digital": self.analyze_digital_footprint(phone_number),
-                "jaringan": self.get_network_details(parsed),
-                "waktu_analisis": datetime.now().isoformat()
-            }
+            # request paralel untuk nomor E.164 yang sama berbagi satu analisis
+            key = ('report', phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.E164))
+            # lookup interaktif mendapat slot CPU/HTTP lebih dulu daripada job bulk
+            return self.single_flight.do(key, self.scheduler.run, priority, self._build_report, phone_number, parsed)
+
+        except Exception as e:
+            logging.error(f"Error generating report: {str(e)}", extra=log_fields(phone_number, 'report', started))
+            raise
+
+    def _build_report(self, phone_number: str, parsed) -> Dict[str, Any]:
+        basic_info = {
+            "format_internasional": phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.INTERNATIONAL),
+            "format_nasional": phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.NATIONAL),
+            "format_e164": phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.E164),
+            "kode_negara": f"+{parsed.country_code}",
+            "nomor_nasional": parsed.national_number,
+            "tipe": str(phonenumbers.number_type(parsed)).split('.')[-1],
+            "valid": phonenumbers.is_valid_number(parsed),
+            "kemungkinan": phonenumbers.is_possible_number(parsed)
+        }
+
+        report = {
+            "informasi_dasar": basic_info,
+            "lokasi": self.get_location_details(parsed),
+            "operator": self.get_deep_carrier_info(phone_number, parsed),
+            "keamanan": self.check_number_security(phone_number),
+            "jejak_digital": self.analyze_digital_footprint(phone_number),
+            "jaringan": self.get_network_details(parsed),
+            "waktu_analisis": datetime.now().isoformat()
+        }
 
+        # section yang fetch upstream-nya gagal dicatat di satu tempat: {section: alasan}
+        failed = {name: section.pop("error") for name, section in report.items()
+                  if isinstance(section, dict) and "error" in section}
+        if failed:
+            report["sumber_gagal"] = failed
+
+        # section berbentuk tetap disimpan sebagai objek slotted; lokasi, operator dan jaringan
+        # dibagi antar report (isinya sama per region/operator). keamanan tetap dict karena
+        # key-nya berbeda per sumber
+        report["informasi_dasar"] = slotted(InformasiDasar, basic_info)
+        report["lokasi"] = slotted(Lokasi, report["lokasi"], self.sections)
+        report["operator"] = slotted(Operator, report["operator"], self.sections)
+        report["jejak_digital"] = slotted(JejakDigital, report["jejak_digital"])
+        report["jaringan"] = slotted(Jaringan, report["jaringan"], self.sections)
+
+        with self.scheduler.cpu.slot():
             self._generate_visualizations(report)
 
-            return report
+        return report
 
-        except Exception as e:
-            logging.error(f"Error generating report: {str(e)}")
-            raise
+    @staticmethod
+    def failed_sections(report: Dict[str, Any]) -> List[str]:
+        """Section yang isinya tidak lengkap karena sumber eksternal gagal (timeout, 5xx, dst.)."""
+        return list(report.get("sumber_gagal") or ())
+
+    def _upstream_failed(self, number, stage: str, error: Exception, started: float) -> str:
+        logging.warning(f"Sumber eksternal gagal: {str(error)}", extra=log_fields(number, stage, started))
+        # alasan singkat tanpa URL (URL memuat nomor)
+        return str(error) if isinstance(error, UpstreamError) else type(error).__name__
+
+    def save_report(self, report: Dict[str, Any]):
+        # report ditulis ke phone_intel.db oleh thread writer, pemanggil tidak menunggu disk
+        number = report['informasi_dasar']['format_e164']
+        self.records.submit((number, json.dumps(report, ensure_ascii=False, default=json_default)))
+
+    def close(self):
+        self.records.close()
 
     def _check_security_databases(self, number: str) -> Dict[str, Any]:
         security_data = {
@@ -235,21 +360,43 @@ class PhoneIntelligence:
             "reputation_score": 0
         }
 
+        key = number_key(phonenumbers.parse(number))
+        security_data["blacklist_status"] = (
+            self.security_db.lookup(key, 'blacklist') + self.security_db.lookup(key, 'watchlist')
+        )
+        security_data["spam_reports"] = self.security_db.lookup(key, 'spam')
+        security_data["reputation_score"] = -10 * (len(security_data["blacklist_status"]) + len(security_data["spam_reports"]))
+
         return security_data
 
+    def _check_reputation(self, number: str) -> Dict[str, Any]:
+        # trust_score hanya diisi jika sumber reputasi memberi skor, tanpa skor aturan trust tidak dihitung
+        reputation = {}
+        started = time.perf_counter()
+        try:
+            response = self._get(f"https://search5-noneu.truecaller.com/v2/search?q={number}")
+            if response.status_code == 200:
+                data = response.json()
+                if data.get("score") is not None:
+                    reputation["trust_score"] = float(data["score"])
+        except UPSTREAM_ERRORS:
+            raise
+        except Exception as e:
+            logging.warning(f"Error checking reputation: {str(e)}", extra=log_fields(number, 'reputation', started))
+        return reputation
+
     def _check_dark_web(self, number: str) -> Dict[str, Any]:
         return {"dark_web_mentions": 0}
 
     def _analyze_scam_patterns(self, number: str) -> Dict[str, Any]:
-        return {"scam_patterns": []}
+        key = number_key(phonenumbers.parse(number))
+        return {"scam_patterns": self.security_db.lookup(key, 'scam')}
 
     def _calculate_risk_score(self, security_info: Dict[str, Any]) -> int:
-        score = 0
-        return score
+        return self.risk_engine.score(security_info)
 
     def _generate_security_recommendations(self, security_info: Dict[str, Any]) -> List[str]:
-        recommendations = []
-        return recommendations
+        return self.risk_engine.recommendations(security_info)
 
     def _check_platform(self, number: str, platform: str) -> Dict[str, Any]:
         result = {}
@@ -280,6 +427,7 @@ class PhoneIntelligence:
         return coverage
 
     def _generate_visualizations(self, report: Dict[str, Any]):
+        started = time.perf_counter()
         try:
             if report["lokasi"]["coordinates"]:
                 m = folium.Map(
@@ -300,11 +448,11 @@ class PhoneIntelligence:
 
             
         except Exception as e:
-            logging.error(f"Error generating visualizations: {str(e)}")
+            logging.error(f"Error generating visualizations: {str(e)}", extra=log_fields(report["informasi_dasar"]["format_e164"], 'visualization', started))
 
     def display_report(self, report: Dict[str, Any]):
         for section, data in report.items():
-            if isinstance(data, dict):
+            if isinstance(data, Mapping):
                 table = Table(title=section.replace('_', ' ').title())
                 table.add_column("Field", style="cyan")
                 table.add_column("Value", style="green")
@@ -344,7 +492,8 @@ def main():
                 
                 # menyimpan laporan
                 with open(f'report_{phone}.json', 'w', encoding='utf-8') as f:
-                    json.dump(report, f, indent=2, ensure_ascii=False)
+                    json.dump(report, f, indent=2, ensure_ascii=False, default=json_default)
+                analyzer.save_report(report)
                 console.print(f"\n[green]Report tersimpan di report_{phone}.json[/green]")
                 
                 if os.path.exists('lokasi_nomor.html'):
@@ -353,5 +502,7 @@ def main():
         except Exception as e:
             console.print(f"[bold red]Error: {str(e)}[/bold red]")
 
+    analyzer.close()
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
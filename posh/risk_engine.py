@@ -0,0 +1,183 @@
+import operator
+import sys
+import time
+from typing import Any, Dict, List
+
+import pandas as pd
+from phonenumbers import PhoneNumberType
+
+# setiap aturan: jika fitur memenuhi kondisi, bobot ditambahkan ke skor (maks 100)
+DEFAULT_RULES = [
+    {
+        "name": "blacklist",
+        "feature": "blacklist_hits", "op": ">=", "value": 1, "weight": 40,
+        "recommendation": "Nomor ada di blacklist/watchlist, blokir panggilan dan pesan dari nomor ini"
+    },
+    {
+        "name": "spam_reports",
+        "feature": "spam_reports", "op": ">=", "value": 1, "weight": 15,
+        "recommendation": "Nomor pernah dilaporkan sebagai spam, jangan bagikan data pribadi"
+    },
+    {
+        "name": "spam_reports_banyak",
+        "feature": "spam_reports", "op": ">=", "value": 3, "weight": 15,
+        "recommendation": "Nomor dilaporkan di banyak sumber spam, laporkan ke operator"
+    },
+    {
+        "name": "scam_pattern",
+        "feature": "scam_hits", "op": ">=", "value": 1, "weight": 25,
+        "recommendation": "Nomor cocok dengan pola penipuan yang dikenal, abaikan permintaan transfer atau OTP"
+    },
+    {
+        "name": "voip",
+        "feature": "voip", "op": "==", "value": True, "weight": 10,
+        "recommendation": "Nomor VOIP mudah dibuat dan dibuang, verifikasi identitas lewat kanal lain"
+    },
+    {
+        "name": "tipe_berisiko",
+        "feature": "number_type", "op": "in",
+        "value": (PhoneNumberType.PREMIUM_RATE, PhoneNumberType.SHARED_COST, PhoneNumberType.UNKNOWN),
+        "weight": 10,
+        "recommendation": "Tipe nomor premium/tidak dikenal, hindari menelepon balik"
+    },
+    {
+        "name": "trust_rendah",
+        "feature": "trust_score", "op": "<", "value": 50, "weight": 15,
+        "recommendation": "Skor reputasi rendah, perlakukan nomor ini dengan hati-hati"
+    },
+    {
+        "name": "trust_sangat_rendah",
+        "feature": "trust_score", "op": "<", "value": 20, "weight": 10,
+        "recommendation": "Skor reputasi sangat rendah, pertimbangkan untuk memblokir nomor ini"
+    }
+]
+
+OPERATORS = {
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le,
+    '==': operator.eq,
+    '!=': operator.ne
+}
+
+MAX_SCORE = 100
+
+# kolom hasil extract_features, juga dipakai agar frame kosong tetap punya semua kolom
+FEATURES = ("blacklist_hits", "spam_reports", "scam_hits", "voip", "number_type", "trust_score")
+
+
+def extract_features(security_info: Dict[str, Any]) -> Dict[str, Any]:
+    # number_type/trust_score yang tidak diketahui dibiarkan None: aturannya tidak ikut dihitung
+    return {
+        "blacklist_hits": len(security_info.get("blacklist_status") or []),
+        "spam_reports": len(security_info.get("spam_reports") or []),
+        "scam_hits": len(security_info.get("scam_patterns") or []),
+        "voip": bool(security_info.get("voip_detection")),
+        "number_type": security_info.get("number_type"),
+        "trust_score": security_info.get("trust_score")
+    }
+
+
+class RiskEngine:
+    def __init__(self, rules: List[Dict[str, Any]] = None):
+        self.rules = rules if rules is not None else DEFAULT_RULES
+        self._compiled = [self._compile(rule) for rule in self.rules]
+
+    @staticmethod
+    def _compile(rule: Dict[str, Any]):
+        feature = rule["feature"]
+        value = rule["value"]
+        if rule["op"] == 'in':
+            members = frozenset(value)
+            test = lambda x: x in members
+            vector_test = lambda series: series.isin(members)
+        else:
+            op = OPERATORS[rule["op"]]
+            test = lambda x: op(x, value)
+            vector_test = lambda series: op(series, value)
+
+        # fitur yang hilang (None/NaN) tidak pernah memicu aturan
+        def check(x):
+            return not pd.isna(x) and test(x)
+
+        def vector_check(series):
+            present = series.notna()
+            fired = pd.Series(False, index=series.index)
+            fired[present] = vector_test(series[present]).astype(bool)
+            return fired
+
+        return feature, check, vector_check, rule["weight"], rule.get("recommendation")
+
+    def _fired(self, features: Dict[str, Any]):
+        for feature, check, _, weight, recommendation in self._compiled:
+            if check(features[feature]):
+                yield weight, recommendation
+
+    def score(self, security_info: Dict[str, Any]) -> int:
+        features = extract_features(security_info)
+        return min(MAX_SCORE, sum(weight for weight, _ in self._fired(features)))
+
+    def recommendations(self, security_info: Dict[str, Any]) -> List[str]:
+        features = extract_features(security_info)
+        return [recommendation for _, recommendation in self._fired(features) if recommendation]
+
+    def features_frame(self, security_infos: List[Dict[str, Any]]) -> pd.DataFrame:
+        return pd.DataFrame.from_records([extract_features(info) for info in security_infos], columns=FEATURES)
+
+    def score_frame(self, features: pd.DataFrame) -> pd.Series:
+        # evaluasi vektor atas satu kolom per fitur, tanpa loop per baris
+        scores = pd.Series(0, index=features.index, dtype='int64')
+        for feature, _, vector_check, weight, _ in self._compiled:
+            scores += vector_check(features[feature]).astype('int64') * weight
+        return scores.clip(upper=MAX_SCORE)
+
+    def score_batch(self, security_infos: List[Dict[str, Any]]) -> pd.Series:
+        return self.score_frame(self.features_frame(security_infos))
+
+
+def _random_features(rows: int) -> pd.DataFrame:
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    number_types = np.array([
+        PhoneNumberType.MOBILE, PhoneNumberType.FIXED_LINE, PhoneNumberType.VOIP,
+        PhoneNumberType.PREMIUM_RATE, PhoneNumberType.UNKNOWN
+    ])
+    return pd.DataFrame({
+        "blacklist_hits": rng.binomial(2, 0.02, rows),
+        "spam_reports": rng.poisson(0.3, rows),
+        "scam_hits": rng.binomial(1, 0.01, rows),
+        "voip": rng.random(rows) < 0.05,
+        "number_type": rng.choice(number_types, rows),
+        "trust_score": rng.integers(0, 101, rows)
+    })
+
+
+def benchmark(rows: int = 1_000_000, engine: RiskEngine = None) -> Dict[str, float]:
+    engine = engine or RiskEngine()
+    features = _random_features(rows)
+
+    start = time.perf_counter()
+    engine.score_frame(features)
+    vector_seconds = time.perf_counter() - start
+
+    sample = features.head(min(rows, 100_000)).to_dict('records')
+    start = time.perf_counter()
+    for row in sample:
+        min(MAX_SCORE, sum(weight for weight, _ in engine._fired(row)))
+    single_seconds = time.perf_counter() - start
+
+    return {
+        "rows": rows,
+        "vector_rows_per_sec": rows / vector_seconds,
+        "single_rows_per_sec": len(sample) / single_seconds
+    }
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    result = benchmark(rows)
+    print(f"Baris             : {result['rows']:,}")
+    print(f"Vektor (baris/s)  : {result['vector_rows_per_sec']:,.0f}")
+    print(f"Tunggal (baris/s) : {result['single_rows_per_sec']:,.0f}")
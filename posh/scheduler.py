@@ -0,0 +1,128 @@
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict
+
+INTERACTIVE = 'interactive'
+BULK = 'bulk'
+
+# bobot pembagian slot saat kedua kelas sama-sama menunggu
+DEFAULT_WEIGHTS = {INTERACTIVE: 4, BULK: 1}
+
+_current = contextvars.ContextVar('priority', default=INTERACTIVE)
+
+
+def current_priority() -> str:
+    return _current.get()
+
+
+@contextmanager
+def priority(name: str):
+    # kelas prioritas berlaku untuk semua pemanggilan di thread/konteks ini
+    token = _current.set(name)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+class FairLimiter:
+    """Budget slot bersama (koneksi HTTP keluar atau worker CPU) untuk beberapa kelas prioritas.
+
+    Setiap kelas bisa memiliki slot cadangan yang tidak boleh dipakai kelas lain, jadi
+    bulk yang memenuhi budget tetap menyisakan slot untuk interactive. Jika beberapa kelas
+    menunggu, slot yang lepas diberikan ke kelas dengan pemakaian/bobot terkecil.
+    """
+
+    def __init__(self, name: str, capacity: int, weights: Dict[str, int] = None, reserved: Dict[str, int] = None):
+        self.name = name
+        self.weights = dict(weights or DEFAULT_WEIGHTS)
+        if reserved is None:
+            # selalu sisakan minimal satu slot untuk interactive, juga di mesin 1 core
+            capacity = max(2, capacity)
+            reserved = {INTERACTIVE: max(1, capacity // 4)}
+        self.capacity = capacity
+        self.reserved = reserved
+        self.cond = threading.Condition()
+        self.in_use = {cls: 0 for cls in self.weights}
+        self.waiting = {cls: 0 for cls in self.weights}
+        self.stats = {cls: {"granted": 0, "wait_seconds": 0.0, "max_wait_seconds": 0.0} for cls in self.weights}
+
+    def _limit(self, cls: str) -> int:
+        return self.capacity - sum(slots for other, slots in self.reserved.items() if other != cls)
+
+    def _share(self, cls: str) -> float:
+        return self.in_use[cls] / self.weights[cls]
+
+    def _eligible(self, cls: str) -> bool:
+        if sum(self.in_use.values()) >= self.capacity or self.in_use[cls] >= self._limit(cls):
+            return False
+        competing = [other for other, count in self.waiting.items()
+                     if count and other != cls and self.in_use[other] < self._limit(other)]
+        return all(self._share(cls) <= self._share(other) for other in competing)
+
+    def acquire(self, cls: str = None):
+        cls = cls or current_priority()
+        if cls not in self.weights:
+            raise ValueError(f"Kelas prioritas tidak dikenal: {cls}")
+        started = time.monotonic()
+        with self.cond:
+            self.waiting[cls] += 1
+            try:
+                while not self._eligible(cls):
+                    self.cond.wait()
+            finally:
+                self.waiting[cls] -= 1
+            self.in_use[cls] += 1
+            waited = time.monotonic() - started
+            stats = self.stats[cls]
+            stats["granted"] += 1
+            stats["wait_seconds"] += waited
+            stats["max_wait_seconds"] = max(stats["max_wait_seconds"], waited)
+            # kelas lain mungkin sekarang boleh jalan
+            self.cond.notify_all()
+        return cls
+
+    def release(self, cls: str):
+        with self.cond:
+            self.in_use[cls] -= 1
+            self.cond.notify_all()
+
+    @contextmanager
+    def slot(self, cls: str = None):
+        cls = self.acquire(cls)
+        try:
+            yield
+        finally:
+            self.release(cls)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.cond:
+            return {
+                "capacity": self.capacity,
+                "reserved": dict(self.reserved),
+                "in_use": dict(self.in_use),
+                "waiting": dict(self.waiting),
+                "classes": {cls: dict(stats) for cls, stats in self.stats.items()}
+            }
+
+
+class Scheduler:
+    """Budget HTTP keluar dan worker CPU yang dibagi antara lookup interaktif dan job bulk."""
+
+    def __init__(self, http_slots: int = 16, cpu_slots: int = None, weights: Dict[str, int] = None):
+        cpu_slots = cpu_slots or os.cpu_count() or 4
+        self.http = FairLimiter('http', http_slots, weights)
+        self.cpu = FairLimiter('cpu', cpu_slots, weights)
+
+    def run(self, cls: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        # jalankan fn sebagai kelas cls; fn tidak memegang slot apa pun selama berjalan.
+        # slot http/cpu diambil hanya di sekitar request keluar dan bagian yang CPU-bound,
+        # jadi job yang menunggu jaringan tidak memblokir worker CPU
+        with priority(cls):
+            return fn(*args, **kwargs)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"http": self.http.snapshot(), "cpu": self.cpu.snapshot()}
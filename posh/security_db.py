@@ -0,0 +1,209 @@
+import bisect
+import mmap
+import os
+import struct
+import sys
+from typing import Dict, Iterable, List, Optional
+
+import phonenumbers
+
+# format file .nset:
+#   header 32 byte  : magic, jumlah nomor, jumlah bit bloom, jumlah hash bloom
+#   nomor           : uint64 terurut (little-endian), 8 byte per nomor
+#   bloom           : bitset opsional, ceil(bloom_bits / 8) byte
+MAGIC = b'PDNSET01'
+HEADER = struct.Struct('<8sQQI4x')
+MASK64 = (1 << 64) - 1
+
+# default di samping repo (ROOT/db/security), tidak bergantung direktori kerja
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'db', 'security')
+
+
+def number_key(parsed) -> int:
+    # kunci unik lintas negara: digit E.164. national_significant_number tetap memuat
+    # nol di depan (mis. nomor Italia 06...), national_number tidak
+    return int(f"{parsed.country_code}{phonenumbers.national_significant_number(parsed)}")
+
+
+def _mix64(value: int) -> int:
+    # splitmix64 finalizer, cukup untuk hash bloom
+    value = (value + 0x9E3779B97F4A7C15) & MASK64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK64
+    return value ^ (value >> 31)
+
+
+def _bloom_positions(key: int, bits: int, hashes: int):
+    h1 = _mix64(key)
+    h2 = _mix64(h1) | 1
+    for i in range(hashes):
+        yield ((h1 + i * h2) & MASK64) % bits
+
+
+def _mix64_array(values):
+    # _mix64 untuk array uint64; perkalian numpy uint64 otomatis modulo 2**64
+    import numpy as np
+
+    values = values + np.uint64(0x9E3779B97F4A7C15)
+    values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+def _bloom_positions_array(keys, bits: int, hashes: int):
+    # posisi yang sama dengan _bloom_positions, dihitung untuk banyak key sekaligus
+    import numpy as np
+
+    h1 = _mix64_array(keys)
+    h2 = _mix64_array(h1) | np.uint64(1)
+    for i in range(hashes):
+        yield (h1 + np.uint64(i) * h2) % np.uint64(bits)
+
+
+class NumberSet:
+    """Set nomor read-only di atas file memory-mapped."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        if size < HEADER.size:
+            self._file.close()
+            raise ValueError(f"File bukan number set: {path}")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, self.bloom_bits, self.bloom_hashes = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"File bukan number set: {path}")
+        # file terpotong (mis. salinan yang belum selesai) tidak boleh dibaca melewati batas mmap
+        expected = HEADER.size + self.count * 8 + (self.bloom_bits + 7) // 8
+        if size < expected or (self.bloom_bits and not self.bloom_hashes):
+            self.close()
+            raise ValueError(f"Number set rusak: {path} ({size} byte, seharusnya {expected})")
+
+        start = HEADER.size
+        end = start + self.count * 8
+        # memoryview cast ke 'Q' memakai byte order native, file ditulis little-endian
+        if sys.byteorder == 'little':
+            self._numbers = memoryview(self._mm)[start:end].cast('Q')
+        else:
+            self._numbers = _BigEndianView(self._mm, start, self.count)
+        self._bloom = memoryview(self._mm)[end:end + (self.bloom_bits + 7) // 8] if self.bloom_bits else None
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, key: int) -> bool:
+        if self._bloom is not None:
+            for pos in _bloom_positions(key, self.bloom_bits, self.bloom_hashes):
+                if not self._bloom[pos >> 3] & (1 << (pos & 7)):
+                    return False
+        i = bisect.bisect_left(self._numbers, key)
+        return i < self.count and self._numbers[i] == key
+
+    def close(self):
+        for view in ('_numbers', '_bloom'):
+            mv = getattr(self, view, None)
+            if isinstance(mv, memoryview):
+                mv.release()
+        if getattr(self, '_mm', None) is not None:
+            self._mm.close()
+        self._file.close()
+
+    @staticmethod
+    def build(path: str, numbers: Iterable[int], bloom_bits_per_key: int = 10, chunk_size: int = 1 << 20):
+        # puluhan juta nomor: buffer uint64 (8 byte per nomor) diurutkan di tempat,
+        # bukan set/list int Python
+        import numpy as np
+
+        values = np.fromiter(numbers, dtype=np.uint64)
+        values.sort()
+        if len(values) > 1:
+            values = values[np.concatenate(([True], values[1:] != values[:-1]))]
+        count = len(values)
+
+        bloom_bits = count * bloom_bits_per_key if bloom_bits_per_key and count else 0
+        bloom_hashes = max(1, round(bloom_bits_per_key * 0.693)) if bloom_bits else 0
+        bloom = np.zeros((bloom_bits + 7) // 8, dtype=np.uint8)
+        for start in range(0, count if bloom_bits else 0, chunk_size):
+            for pos in _bloom_positions_array(values[start:start + chunk_size], bloom_bits, bloom_hashes):
+                np.bitwise_or.at(bloom, pos >> np.uint64(3),
+                                 np.left_shift(1, pos & np.uint64(7)).astype(np.uint8))
+
+        # tulis ke file sementara lalu rename, supaya pembaca tidak pernah melihat file setengah jadi
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, count, bloom_bits, bloom_hashes))
+            values.astype('<u8', copy=False).tofile(f)
+            bloom.tofile(f)
+        os.replace(tmp_path, path)
+
+
+class _BigEndianView:
+    def __init__(self, mm, start: int, count: int):
+        self._mm = mm
+        self._start = start
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        return struct.unpack_from('<Q', self._mm, self._start + i * 8)[0]
+
+
+class SecurityDatabase:
+    """Kumpulan number set per kategori, dibaca dari satu direktori.
+
+    Nama file menentukan kategori, mis. ``blacklist_operator.nset``,
+    ``watchlist_internal.nset``, ``spam_laporan.nset`` atau ``scam_2024.nset``.
+    """
+
+    CATEGORIES = ('blacklist', 'watchlist', 'spam', 'scam')
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or os.getenv('SECURITY_DB_DIR', DEFAULT_DIR)
+        self.sets: Dict[str, Dict[str, NumberSet]] = {category: {} for category in self.CATEGORIES}
+        if os.path.isdir(self.directory):
+            for filename in sorted(os.listdir(self.directory)):
+                name, ext = os.path.splitext(filename)
+                category = name.split('_', 1)[0]
+                if ext == '.nset' and category in self.sets:
+                    self.sets[category][name] = NumberSet(os.path.join(self.directory, filename))
+
+    def lookup(self, key: int, category: str) -> List[str]:
+        return [name for name, number_set in self.sets[category].items() if key in number_set]
+
+    def close(self):
+        for number_sets in self.sets.values():
+            for number_set in number_sets.values():
+                number_set.close()
+            number_sets.clear()
+
+
+def _read_numbers(path: str):
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield number_key(phonenumbers.parse(line))
+            except phonenumbers.NumberParseException:
+                continue
+
+
+def main():
+    # python security_db.py <output.nset> <daftar_nomor.txt> [bloom_bits_per_key]
+    if len(sys.argv) < 3:
+        print("Penggunaan: python security_db.py <output.nset> <daftar_nomor.txt> [bloom_bits_per_key]")
+        sys.exit(1)
+    bits_per_key = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+    NumberSet.build(sys.argv[1], _read_numbers(sys.argv[2]), bits_per_key)
+    number_set = NumberSet(sys.argv[1])
+    print(f"{len(number_set)} nomor tersimpan di {sys.argv[1]}")
+    number_set.close()
+
+
+if __name__ == "__main__":
+    main()
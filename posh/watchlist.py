@@ -0,0 +1,195 @@
+import argparse
+import json
+import sqlite3
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from posh2 import PhoneIntelligence, REPORT_SCHEMA
+from sections import json_default
+from scheduler import BULK
+
+# field yang selalu berubah di setiap run dan bukan perubahan data nomor; sumber_gagal
+# ditangani terpisah di Watchlist.compare
+IGNORED = {'waktu_analisis', 'sumber_gagal'}
+
+
+def _normalize(report: Dict[str, Any]) -> Dict[str, Any]:
+    # samakan tipe dengan report yang tersimpan (section slotted -> dict, tuple -> list, datetime -> str)
+    return json.loads(json.dumps(report, ensure_ascii=False, default=json_default))
+
+
+def _without(report: Dict[str, Any], sections) -> Dict[str, Any]:
+    return {key: value for key, value in report.items() if key not in sections}
+
+
+def _hashable_list(value) -> bool:
+    return isinstance(value, list) and all(isinstance(item, (str, int, float, bool, type(None))) for item in value)
+
+
+def diff_reports(old: Any, new: Any, path: str = '') -> List[Dict[str, Any]]:
+    """Perubahan struktural antara dua report: path bertitik + nilai lama/baru."""
+    if old == new:
+        return []
+    if isinstance(old, dict) and isinstance(new, dict):
+        changes = []
+        for key in list(old) + [key for key in new if key not in old]:
+            if not path and key in IGNORED:
+                continue
+            sub_path = f"{path}.{key}" if path else key
+            if key not in new:
+                changes.append({"path": sub_path, "op": "dihapus", "lama": old[key]})
+            elif key not in old:
+                changes.append({"path": sub_path, "op": "ditambah", "baru": new[key]})
+            else:
+                changes.extend(diff_reports(old[key], new[key], sub_path))
+        return changes
+    if _hashable_list(old) and _hashable_list(new):
+        added = [item for item in new if item not in old]
+        removed = [item for item in old if item not in new]
+        if not added and not removed:
+            # hanya urutan yang berbeda
+            return []
+        return [{"path": path, "op": "list", "ditambah": added, "dihapus": removed}]
+    return [{"path": path, "op": "diubah", "lama": old, "baru": new}]
+
+
+class Watchlist:
+    """Scan ulang daftar nomor dan hasilkan hanya perubahan terhadap report sebelumnya.
+
+    Report terakhir per nomor disimpan di phone_intel.db (tabel phone_records); report
+    yang tidak berubah tidak ditulis ulang dan tidak menghasilkan output. Section yang
+    fetch upstream-nya gagal (sumber_gagal) tidak dibandingkan dan memakai nilai terakhir
+    yang berhasil, jadi upstream yang kadang gagal tidak menghasilkan perubahan palsu.
+    """
+
+    def __init__(self, intel, db_path: str = 'phone_intel.db', sections: Optional[List[str]] = None):
+        self.intel = intel
+        self.db_path = db_path
+        self.sections = sections
+        self.stats = {"diperiksa": 0, "baru": 0, "berubah": 0, "tetap": 0, "error": 0, "sebagian_gagal": 0}
+
+    def _previous(self, conn: sqlite3.Connection, number: str) -> Optional[Dict[str, Any]]:
+        row = conn.execute("SELECT analysis_data FROM phone_records WHERE phone_number = ?", (number,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _select(self, report: Dict[str, Any]) -> Dict[str, Any]:
+        if not self.sections:
+            return report
+        return {key: value for key, value in report.items() if key in self.sections}
+
+    def compare(self, conn: sqlite3.Connection, number: str, report: Optional[Dict[str, Any]],
+                error: Exception = None) -> Optional[Dict[str, Any]]:
+        self.stats["diperiksa"] += 1
+        if error is not None:
+            self.stats["error"] += 1
+            return {"nomor": number, "error": str(error)}
+
+        report = _normalize(report)
+        e164 = report['informasi_dasar']['format_e164']
+        failed = set(self.intel.failed_sections(report))
+        if failed:
+            self.stats["sebagian_gagal"] += 1
+        previous = self._previous(conn, e164)
+        if previous is None:
+            self.stats["baru"] += 1
+            self.intel.save_report(report)
+            return {"nomor": e164, "status": "baru", "report": self._select(report)}
+
+        # section yang gagal sekarang memakai nilai tersimpan jika nilai itu lengkap
+        previous_failed = set(self.intel.failed_sections(previous))
+        merged = dict(report)
+        still_failed = dict(report.get('sumber_gagal') or {})
+        for name in failed - previous_failed:
+            if name in previous:
+                merged[name] = previous[name]
+                still_failed.pop(name, None)
+        for name in previous_failed & failed:
+            still_failed.setdefault(name, previous['sumber_gagal'][name])
+        merged.pop('sumber_gagal', None)
+        if still_failed:
+            merged['sumber_gagal'] = still_failed
+
+        # section yang tidak lengkap di salah satu sisi tidak dibandingkan
+        unchecked = failed | previous_failed
+        changes = diff_reports(self._select(_without(previous, unchecked)), self._select(_without(merged, unchecked)))
+        if not changes:
+            self.stats["tetap"] += 1
+            if previous_failed - failed:
+                # report tersimpan yang tidak lengkap diperbaiki tanpa menghasilkan output
+                self.intel.save_report(merged)
+            return None
+
+        self.stats["berubah"] += 1
+        self.intel.save_report(merged)
+        change = {"nomor": e164, "status": "berubah", "sejak": previous.get('waktu_analisis'), "perubahan": changes}
+        if unchecked:
+            change["tidak_diperiksa"] = sorted(unchecked)
+        return change
+
+    def _generate(self, number: str):
+        try:
+            return self.intel.generate_report(number, priority=BULK), None
+        except Exception as e:
+            return None, e
+
+    def run(self, numbers: Iterable[str], workers: int = 4, chunk_size: int = 100) -> Iterator[Dict[str, Any]]:
+        """Report dibuat paralel; pembacaan report lama dan diff dilakukan di thread pemanggil."""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(REPORT_SCHEMA)
+        seen = set()
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                chunk = []
+                for number in numbers:
+                    number = number.strip()
+                    # nomor ganda dalam satu run hanya diperiksa sekali
+                    if not number or number in seen:
+                        continue
+                    seen.add(number)
+                    chunk.append(number)
+                    if len(chunk) >= chunk_size:
+                        yield from self._run_chunk(conn, pool, chunk)
+                        chunk = []
+                yield from self._run_chunk(conn, pool, chunk)
+        finally:
+            conn.close()
+
+    def _run_chunk(self, conn, pool, chunk: List[str]):
+        for number, (report, error) in zip(chunk, pool.map(self._generate, chunk)):
+            change = self.compare(conn, number, report, error)
+            if change is not None:
+                yield change
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scan ulang watchlist, tulis hanya perubahan sejak scan sebelumnya")
+    parser.add_argument('input', help="file teks, satu nomor per baris")
+    parser.add_argument('--output', help="file JSON Lines untuk perubahan (default: stdout)")
+    parser.add_argument('--sections', help="bagian report yang dibandingkan, dipisah koma (mis. keamanan,jejak_digital,operator)")
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    intel = PhoneIntelligence()
+    sections = [section.strip() for section in args.sections.split(',')] if args.sections else None
+    watchlist = Watchlist(intel, sections=sections)
+
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        with open(args.input, encoding='utf-8') as f:
+            for change in watchlist.run(f, args.workers):
+                out.write(json.dumps(change, ensure_ascii=False, default=str) + '\n')
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        # report baru/berubah ditulis lewat write-behind, pastikan tersimpan sebelum keluar
+        intel.close()
+
+    stats = watchlist.stats
+    print(f"{stats['diperiksa']} diperiksa: {stats['baru']} baru, {stats['berubah']} berubah, "
+          f"{stats['tetap']} tetap, {stats['error']} error, {stats['sebagian_gagal']} sumber gagal sebagian",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
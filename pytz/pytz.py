@@ -1,30 +1,35 @@
 import phonenumbers
-from phonenumbers import geocoder, carrier, timezone
+from phonenumbers import geocoder, carrier
 import requests
 import json
 from datetime import datetime
 import pytz
-from typing import Dict, Any
+from typing import Dict, Any, List
 from rich.console import Console
 from rich.table import Table
 import folium
 import logging
+import time
 import os
-from fake_useragent import UserAgent
+import sys
+# modul bersama chip/posh/pytz (logging, header, write-behind, profiling, zona waktu) ada di ../shared
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'shared'))
+from headers import default_pool
 from bs4 import BeautifulSoup
+from osint_log import start_logging, log_fields
+from timezones import time_zones_for, get_tz, LocalTime
+from profiling import ReportProfiler
 
 class PhoneIntelligence:
     def __init__(self):
         self.setup_logging()
         self.console = Console()
-        self.ua = UserAgent()
+        self.headers = default_pool()
+        self.profiler = ReportProfiler()
         
     def setup_logging(self):
-        logging.basicConfig(
-            filename='phone_osint.log',
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s'
-        )
+        # logging lewat antrian, file ditulis oleh thread latar belakang dengan rotasi
+        start_logging('phone_osint.log', level=logging.INFO)
 
     def search_number_reputation(self, number: str) -> Dict[str, Any]:
         """Search phone number reputation"""
@@ -40,7 +45,7 @@ class PhoneIntelligence:
             "scam": f"https://scam.directory/api/v1/phone/{number}"
         }
         
-        headers = {'User-Agent': self.ua.random}
+        headers = self.headers.next()
         
         for source, url in apis.items():
             try:
@@ -68,7 +73,7 @@ class PhoneIntelligence:
         }
         
         results = {}
-        headers = {'User-Agent': self.ua.random}
+        headers = self.headers.next()
         
         for platform, url in platforms.items():
             try:
@@ -92,7 +97,7 @@ class PhoneIntelligence:
         
         try:
             geocoding_url = f"https://nominatim.openstreetmap.org/search?country={country}&format=json"
-            response = requests.get(geocoding_url, headers={'User-Agent': self.ua.random})
+            response = requests.get(geocoding_url, headers=self.headers.next(), timeout=5)
             if response.status_code == 200 and response.json():
                 data = response.json()[0]
                 location["coordinates"] = {
@@ -104,12 +109,19 @@ class PhoneIntelligence:
             
         return location
 
-    def generate_report(self, phone_number: str) -> Dict[str, Any]:
+    def generate_report(self, phone_number: str, clock: datetime = None) -> Dict[str, Any]:
         """Generate comprehensive phone number report"""
+        # profiling opsional untuk sebagian request (PHONE_PROFILE / PHONE_PROFILE_NUMBERS)
+        return self.profiler.run('report', phone_number, self._generate_report, phone_number, clock)
+
+    def _generate_report(self, phone_number: str, clock: datetime = None) -> Dict[str, Any]:
+        clock = clock or datetime.now(pytz.utc)
+        started = time.perf_counter()
         try:
             parsed = phonenumbers.parse(phone_number)
             if not phonenumbers.is_valid_number(parsed):
                 raise ValueError("Nomor telepon tidak valid")
+            number_type = phonenumbers.number_type(parsed)
 
             # Basic info
             basic_info = {
@@ -118,7 +130,7 @@ class PhoneIntelligence:
                 "format_e164": phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.E164),
                 "kode_negara": f"+{parsed.country_code}",
                 "nomor_nasional": parsed.national_number,
-                "tipe": str(phonenumbers.number_type(parsed)).split('.')[-1]
+                "tipe": str(number_type).split('.')[-1]
             }
 
             # Location info
@@ -131,10 +143,10 @@ class PhoneIntelligence:
             }
 
             # Timezone info
-            tz_list = timezone.time_zones_for_number(parsed)
+            tz_list = time_zones_for(parsed, number_type)
             timezone_info = {
                 "zona_waktu": tz_list[0] if tz_list else "Unknown",
-                "waktu_lokal": datetime.now(pytz.timezone(tz_list[0])).strftime("%Y-%m-%d %H:%M:%S") if tz_list else "Unknown"
+                "waktu_lokal": LocalTime(get_tz(tz_list[0]), clock) if tz_list else "Unknown"
             }
 
             # Additional checks
@@ -148,7 +160,7 @@ class PhoneIntelligence:
                 "zona_waktu": timezone_info,
                 "reputasi": reputation,
                 "media_sosial": social_media,
-                "waktu_analisis": datetime.now().isoformat()
+                "waktu_analisis": clock.astimezone().replace(tzinfo=None).isoformat()
             }
 
             # Generate map if coordinates available
@@ -166,9 +178,20 @@ class PhoneIntelligence:
             return report
 
         except Exception as e:
-            logging.error(f"Error analyzing number {phone_number}: {str(e)}")
+            logging.error(f"Error analyzing number: {str(e)}", extra=log_fields(phone_number, 'report', started))
             raise
 
+    def generate_reports(self, phone_numbers: List[str]) -> List[Dict[str, Any]]:
+        # satu pembacaan jam untuk seluruh batch
+        clock = datetime.now(pytz.utc)
+        reports = []
+        for phone_number in phone_numbers:
+            try:
+                reports.append(self.generate_report(phone_number, clock))
+            except Exception as e:
+                reports.append({"nomor": phone_number, "error": str(e)})
+        return reports
+
     def display_report(self, report: Dict[str, Any]):
         """Display formatted report"""
         for section, data in report.items():
@@ -208,7 +231,7 @@ def main():
                 
                 # Save report
                 with open(f'report_{phone}.json', 'w', encoding='utf-8') as f:
-                    json.dump(report, f, indent=2, ensure_ascii=False)
+                    json.dump(report, f, indent=2, ensure_ascii=False, default=str)
                 console.print(f"\n[green]Report tersimpan di report_{phone}.json[/green]")
 
         except Exception as e:
@@ -0,0 +1,234 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Any, Dict, List
+from urllib.parse import urlparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'posh'))
+sys.path.insert(0, os.path.join(ROOT, 'chip'))
+sys.path.insert(0, os.path.join(ROOT, 'shared'))
+
+import phonenumbers
+from phonenumbers import carrier, geocoder
+from chip import PhoneNumberAnalyzer
+from posh2 import PhoneIntelligence
+from scheduler import INTERACTIVE, BULK
+from sections import json_default
+
+MAX_BATCH = 1000
+
+
+class Metrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.in_flight = 0
+        self.endpoints: Dict[str, Dict[str, float]] = {}
+
+    def begin(self):
+        with self.lock:
+            self.in_flight += 1
+
+    def end(self, endpoint: str, duration: float, error: bool):
+        with self.lock:
+            self.in_flight -= 1
+            stats = self.endpoints.setdefault(endpoint, {"requests": 0, "errors": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+            stats["requests"] += 1
+            stats["errors"] += int(error)
+            stats["total_seconds"] += duration
+            stats["max_seconds"] = max(stats["max_seconds"], duration)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            endpoints = {
+                name: dict(stats, avg_seconds=stats["total_seconds"] / stats["requests"])
+                for name, stats in self.endpoints.items()
+            }
+            return {
+                "uptime_seconds": round(time.time() - self.started, 3),
+                "in_flight": self.in_flight,
+                "endpoints": endpoints
+            }
+
+
+class AnalyzerService:
+    """Analyzer yang tetap hangat di antara request, beserta worker pool untuk batch."""
+
+    def __init__(self, batch_workers: int = 8):
+        self.analyzer = PhoneNumberAnalyzer()
+        self.intel = PhoneIntelligence()
+        self.batch_pool = ThreadPoolExecutor(max_workers=batch_workers, thread_name_prefix='batch')
+        self.metrics = Metrics()
+        self.warm_up()
+
+    def warm_up(self):
+        # memuat metadata phonenumbers sekali di awal, bukan saat request pertama
+        parsed = phonenumbers.parse("+6281234567890")
+        phonenumbers.is_valid_number(parsed)
+        carrier.name_for_number(parsed, "id")
+        geocoder.description_for_number(parsed, "id")
+
+    def analyze(self, number: str, priority: str = INTERACTIVE) -> Dict[str, Any]:
+        with self.intel.scheduler.cpu.slot(priority):
+            return self.analyzer.analyze_phone_number(number)
+
+    def report(self, number: str, priority: str = INTERACTIVE) -> Dict[str, Any]:
+        try:
+            report = self.intel.generate_report(number, priority)
+            self.intel.save_report(report)
+            return report
+        except Exception as e:
+            return {"nomor": number, "error": str(e)}
+
+    def batch(self, fn, numbers: List[str]) -> List[Dict[str, Any]]:
+        # endpoint batch selalu berjalan sebagai bulk agar tidak menghambat request tunggal
+        return list(self.batch_pool.map(lambda number: fn(number, BULK), numbers))
+
+    def close(self):
+        self.batch_pool.shutdown(wait=True)
+        # simpan sisa hasil di antrian write-behind sebelum keluar
+        self.analyzer.close()
+        self.intel.close()
+
+
+class PooledHTTPServer(HTTPServer):
+    """HTTPServer dengan jumlah thread terbatas; koneksi berlebih menunggu di backlog socket."""
+
+    def __init__(self, address, handler, service: AnalyzerService, workers: int = 16):
+        super().__init__(address, handler)
+        self.service = service
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='http')
+        self.slots = threading.BoundedSemaphore(workers)
+
+    def process_request(self, request, client_address):
+        self.slots.acquire()
+        self.executor.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self.slots.release()
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=True)
+        self.service.close()
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # koneksi keep-alive yang diam dilepas agar tidak menahan slot worker
+    timeout = 30
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload: Dict[str, Any]):
+        # report chip berupa objek slotted, baru diubah ke dict di sini
+        body = json.dumps(payload, ensure_ascii=False, default=json_default).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length) or b'{}')
+
+    def do_GET(self):
+        service = self.server.service
+        path = urlparse(self.path).path
+        if path == '/health':
+            self._send_json(200, {"status": "ok"})
+        elif path == '/metrics':
+            metrics = service.metrics.snapshot()
+            metrics["coalesced_requests"] = service.intel.single_flight.shared
+            writers = (service.analyzer.history, service.intel.records)
+            metrics["write_behind"] = {w.db_path: w.info() for w in writers}
+            metrics["scheduler"] = service.intel.scheduler.snapshot()
+            self._send_json(200, metrics)
+        else:
+            self._send_json(404, {"error": "Endpoint tidak ditemukan"})
+
+    def do_POST(self):
+        service = self.server.service
+        path = urlparse(self.path).path
+        routes = {
+            '/analyze': service.analyze,
+            '/report': service.report
+        }
+
+        start = time.perf_counter()
+        service.metrics.begin()
+        status = 200
+        try:
+            body = self._read_json()
+            if not isinstance(body, dict):
+                # mis. body "[...]", "null" atau angka: JSON valid tapi bukan objek
+                status, payload = 400, {"error": "Body harus berupa objek JSON"}
+            elif path in routes:
+                priority = body.get("priority", INTERACTIVE)
+                if not isinstance(body.get("number"), str):
+                    status, payload = 400, {"error": "Field 'number' wajib diisi"}
+                elif priority not in (INTERACTIVE, BULK):
+                    status, payload = 400, {"error": f"Field 'priority' harus '{INTERACTIVE}' atau '{BULK}'"}
+                else:
+                    payload = routes[path](body["number"], priority)
+            elif path.endswith('/batch') and path[:-len('/batch')] in routes:
+                numbers = body.get("numbers")
+                if not isinstance(numbers, list) or not all(isinstance(n, str) for n in numbers):
+                    status, payload = 400, {"error": "Field 'numbers' harus berupa list string"}
+                elif len(numbers) > MAX_BATCH:
+                    status, payload = 413, {"error": f"Maksimal {MAX_BATCH} nomor per batch"}
+                else:
+                    payload = {"results": service.batch(routes[path[:-len('/batch')]], numbers)}
+            else:
+                status, payload = 404, {"error": "Endpoint tidak ditemukan"}
+        except json.JSONDecodeError:
+            status, payload = 400, {"error": "Body bukan JSON yang valid"}
+        except Exception as e:
+            status, payload = 500, {"error": f"Terjadi kesalahan: {str(e)}"}
+        finally:
+            endpoint = path if status != 404 else 'unknown'
+            service.metrics.end(endpoint, time.perf_counter() - start, status >= 400)
+
+        self._send_json(status, payload)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PhoneDetective HTTP/JSON server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--workers', type=int, default=16, help="jumlah thread HTTP")
+    parser.add_argument('--batch-workers', type=int, default=8, help="jumlah worker untuk endpoint batch")
+    parser.add_argument('--profile', type=float, metavar='RATE', help="profil fraksi request ini (0..1), default PHONE_PROFILE")
+    parser.add_argument('--profile-dir', help="direktori trace profiling, default PHONE_PROFILE_DIR atau profiles")
+    args = parser.parse_args()
+
+    service = AnalyzerService(batch_workers=args.batch_workers)
+    if args.profile is not None or args.profile_dir:
+        for profiler in (service.analyzer.profiler, service.intel.profiler):
+            profiler.configure(profiler.rate if args.profile is None else args.profile, args.profile_dir)
+    server = PooledHTTPServer((args.host, args.port), RequestHandler, service, workers=args.workers)
+    print(f"PhoneDetective server berjalan di http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
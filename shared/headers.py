@@ -0,0 +1,69 @@
+import itertools
+import os
+import random
+from functools import lru_cache
+from typing import Dict, List
+
+USER_AGENTS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'user_agents.txt')
+
+ACCEPT_LANGUAGE = 'id-ID,id;q=0.9,en-US;q=0.8,en;q=0.7'
+ACCEPT = {
+    'firefox': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'safari': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'chrome': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8'
+}
+
+
+def _browser(user_agent: str) -> str:
+    if 'Firefox/' in user_agent:
+        return 'firefox'
+    if 'Safari/' in user_agent and 'Chrome/' not in user_agent:
+        return 'safari'
+    return 'chrome'
+
+
+def load_user_agents(path: str = USER_AGENTS_FILE) -> List[str]:
+    with open(path, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+
+class HeaderPool:
+    """Kumpulan header request siap pakai yang dibangun sekali dari daftar User-Agent offline.
+
+    next() mengembalikan header berikutnya secara bergiliran dalam O(1) dan aman dipakai
+    banyak thread. Dict yang dikembalikan dipakai bersama, jadi jangan diubah; salin dulu
+    jika perlu menambah header. Setiap proses mulai dari posisi acak agar tidak serempak.
+    """
+
+    def __init__(self, path: str = USER_AGENTS_FILE):
+        self.path = path
+        self.pool: List[Dict[str, str]] = [
+            {
+                'User-Agent': user_agent,
+                'Accept': ACCEPT[_browser(user_agent)],
+                'Accept-Language': ACCEPT_LANGUAGE
+            }
+            for user_agent in load_user_agents(path)
+        ]
+        if not self.pool:
+            raise ValueError(f"Daftar User-Agent kosong: {path}")
+        # next() pada itertools.count atomik di CPython, tidak perlu lock
+        self._counter = itertools.count(random.randrange(len(self.pool)))
+
+    def next(self) -> Dict[str, str]:
+        return self.pool[next(self._counter) % len(self.pool)]
+
+    def user_agent(self) -> str:
+        return self.next()['User-Agent']
+
+    def __len__(self) -> int:
+        return len(self.pool)
+
+    def __reduce__(self):
+        # dikirim ke process lain cukup sebagai path; pool dibangun ulang di sana
+        return (HeaderPool, (self.path,))
+
+
+@lru_cache(maxsize=None)
+def default_pool() -> HeaderPool:
+    return HeaderPool()
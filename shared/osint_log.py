@@ -0,0 +1,179 @@
+import atexit
+import hashlib
+import logging
+import logging.handlers
+import queue
+import re
+import threading
+import time
+from typing import Any, Dict
+
+import phonenumbers
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s [stage=%(stage)s nomor=%(number_hash)s durasi=%(duration)s]'
+
+_listener = None
+_queue_handler = None
+_lock = threading.Lock()
+
+
+# bagian pesan yang bisa memuat nomor: URL (mis. .../portability/+62...), "url: /path" dari
+# pesan error requests, dan deretan digit yang mirip nomor telepon
+_SCRUB_PATTERNS = [
+    (re.compile(r'[a-zA-Z][\w+.-]*://\S+'), '<url>'),
+    (re.compile(r'(url: )\S+'), r'\1<url>'),
+    (re.compile(r'\+\d[\d\s().-]{5,}\d|\b\d{7,}\b'), '<nomor>')
+]
+
+
+def number_hash(number) -> str:
+    # nomor tidak ditulis mentah ke log, cukup hash pendeknya; hash dihitung dari format E.164
+    # agar objek parsed, "+62 812-..." dan "+62812..." menghasilkan hash yang sama
+    try:
+        if not hasattr(number, 'country_code'):
+            number = phonenumbers.parse(str(number))
+        number = phonenumbers.format_number(number, phonenumbers.PhoneNumberFormat.E164)
+    except phonenumbers.NumberParseException:
+        pass
+    return hashlib.sha1(str(number).encode('utf-8')).hexdigest()[:12]
+
+
+def scrub(message: str) -> str:
+    for pattern, replacement in _SCRUB_PATTERNS:
+        message = pattern.sub(replacement, message)
+    return message
+
+
+def log_fields(number, stage: str, started: float = None) -> Dict[str, Any]:
+    return {
+        "stage": stage,
+        "number_hash": number_hash(number) if number is not None else '-',
+        "duration": f"{time.perf_counter() - started:.3f}s" if started is not None else '-'
+    }
+
+
+class StructuredFields(logging.Filter):
+    def filter(self, record):
+        for field in ('stage', 'number_hash', 'duration'):
+            if not hasattr(record, field):
+                setattr(record, field, '-')
+        return True
+
+
+class ScrubFilter(logging.Filter):
+    """Buang nomor dan URL dari pesan sebelum masuk antrian.
+
+    Pesan yang sudah bersih juga menjadi key RepeatFilter, jadi error yang sama untuk
+    nomor berbeda dihitung sebagai satu pesan.
+    """
+
+    def filter(self, record):
+        record.msg = scrub(record.getMessage())
+        record.args = ()
+        return True
+
+
+class RepeatFilter(logging.Filter):
+    """Membatasi error identik: `burst` pertama per window lolos, sisanya disampling 1 dari `sample_every`."""
+
+    def __init__(self, burst: int = 5, window: float = 60.0, sample_every: int = 100, min_level: int = logging.WARNING):
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        self.sample_every = sample_every
+        self.min_level = min_level
+        self.lock = threading.Lock()
+        self.seen: Dict[Any, list] = {}
+
+    def filter(self, record):
+        if record.levelno < self.min_level:
+            return True
+
+        key = (record.levelno, record.msg)
+        now = time.monotonic()
+        with self.lock:
+            state = self.seen.get(key)
+            if state is None or now - state[0] >= self.window:
+                if len(self.seen) >= 10000:
+                    self.seen.clear()
+                suppressed = state[2] if state else 0
+                self.seen[key] = [now, 1, 0]
+            else:
+                state[1] += 1
+                if state[1] <= self.burst or state[1] % self.sample_every == 0:
+                    suppressed, state[2] = state[2], 0
+                else:
+                    state[2] += 1
+                    return False
+
+        if suppressed:
+            record.msg = f"{record.msg} (+{suppressed} pesan serupa disembunyikan)"
+        return True
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    # saat antrian penuh record dibuang, thread analisis tidak pernah menunggu disk
+    dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class RotatingLogHandler(logging.handlers.RotatingFileHandler):
+    """Rotasi berdasarkan ukuran file atau umur file, mana yang lebih dulu."""
+
+    def __init__(self, filename: str, max_bytes: int, backup_count: int, max_age: float):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8', delay=True)
+        self.max_age = max_age
+        self.rollover_at = time.time() + max_age
+
+    def shouldRollover(self, record):
+        if self.max_age and time.time() >= self.rollover_at:
+            return True
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        super().doRollover()
+        self.rollover_at = time.time() + self.max_age
+
+
+def start_logging(filename: str = 'phone_osint.log', level: int = logging.INFO,
+                  max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5, max_age: float = 24 * 3600,
+                  queue_size: int = 10000, burst: int = 5, window: float = 60.0, sample_every: int = 100):
+    """Pasang logging asinkron di root logger; file hanya ditulis oleh satu thread latar belakang."""
+    global _listener, _queue_handler
+    with _lock:
+        if _listener is not None:
+            return _listener
+
+        file_handler = RotatingLogHandler(filename, max_bytes, backup_count, max_age)
+        file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        file_handler.addFilter(StructuredFields())
+
+        log_queue = queue.Queue(maxsize=queue_size)
+        _queue_handler = DroppingQueueHandler(log_queue)
+        _queue_handler.addFilter(ScrubFilter())
+        _queue_handler.addFilter(RepeatFilter(burst, window, sample_every))
+
+        root = logging.getLogger()
+        root.addHandler(_queue_handler)
+        root.setLevel(level)
+
+        _listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(stop_logging)
+        return _listener
+
+
+def stop_logging():
+    # flush sisa antrian ke file sebelum proses selesai
+    global _listener, _queue_handler
+    with _lock:
+        if _listener is not None:
+            logging.getLogger().removeHandler(_queue_handler)
+            _listener.stop()
+            _listener = None
+            _queue_handler = None
@@ -0,0 +1,122 @@
+import cProfile
+import json
+import os
+import pstats
+import random
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Tuple
+
+from osint_log import number_hash
+
+# kategori waktu berdasarkan lokasi fungsi; dicek berurutan, yang pertama cocok dipakai.
+# cProfile hanya melihat thread pemanggil: tulis SQLite (thread write-behind) dan tampilan
+# rich (display_report, di luar generate_report) tidak ikut terukur, jadi tidak diberi kategori
+CATEGORIES: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ('metadata', ('phonenumbers/data', 'phonenumbers/geodata', 'phonenumbers/carrierdata',
+                  'phonenumbers/tzdata', 'phonenumbers/shortdata', 'importlib._bootstrap')),
+    ('phonenumbers', ('phonenumbers/',)),
+    ('http', ('requests/', 'urllib3/', 'http/client', 'socket', 'ssl', 'idna/', 'charset_normalizer/')),
+    ('parsing', ('bs4/', 'html/parser', 'lxml', 'soupsieve/')),
+    ('rendering', ('folium/', 'branca/', 'jinja2/')),
+)
+
+
+def _category(func: Tuple[str, int, str]) -> str:
+    filename, _, name = func
+    location = f"{filename}:{name}".replace(os.sep, '/')
+    for category, markers in CATEGORIES:
+        if any(marker in location for marker in markers):
+            return category
+    return 'lainnya'
+
+
+def breakdown(stats: pstats.Stats) -> Dict[str, float]:
+    """Total waktu sendiri (tottime) per kategori, dalam detik."""
+    totals: Dict[str, float] = {}
+    for func, (_, _, tottime, _, _) in stats.stats.items():
+        category = _category(func)
+        totals[category] = totals.get(category, 0.0) + tottime
+    return {category: round(seconds, 6) for category, seconds in sorted(totals.items(), key=lambda item: -item[1])}
+
+
+class ReportProfiler:
+    """Profiling cProfile opsional untuk sebagian request.
+
+    Aktif lewat PHONE_PROFILE (fraksi sampel 0..1) atau PHONE_PROFILE_NUMBERS (daftar
+    nomor yang selalu diprofil, dipisah koma). Trace .prof dan ringkasan .json ditulis
+    ke PHONE_PROFILE_DIR. Saat nonaktif hanya ada satu pengecekan per request.
+    """
+
+    def __init__(self, rate: float = None, directory: str = None, numbers=None):
+        self.configure(
+            float(os.getenv('PHONE_PROFILE', '0') or 0) if rate is None else rate,
+            directory or os.getenv('PHONE_PROFILE_DIR', 'profiles'),
+            numbers if numbers is not None else
+            [n for n in os.getenv('PHONE_PROFILE_NUMBERS', '').split(',') if n.strip()]
+        )
+        # cProfile tidak bisa aktif di dua thread sekaligus dengan aman; request lain dilewati
+        self._lock = threading.Lock()
+
+    def configure(self, rate: float, directory: str = None, numbers=None):
+        self.rate = max(0.0, min(1.0, rate))
+        if directory:
+            self.directory = directory
+        if numbers is not None:
+            self.numbers = {n.strip() for n in numbers}
+        self.enabled = bool(self.rate or self.numbers)
+
+    def run(self, kind: str, number: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        if not self.enabled:
+            return fn(*args, **kwargs)
+        forced = isinstance(number, str) and number.strip() in self.numbers
+        if not forced and random.random() >= self.rate:
+            return fn(*args, **kwargs)
+        if not self._lock.acquire(blocking=False):
+            return fn(*args, **kwargs)
+
+        profile = cProfile.Profile()
+        started = time.perf_counter()
+        error = None
+        try:
+            profile.enable()
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                profile.disable()
+                self._write(kind, number, profile, time.perf_counter() - started, error)
+        finally:
+            self._lock.release()
+
+    def _write(self, kind: str, number: str, profile: cProfile.Profile, seconds: float, error):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # hash yang sama dengan field nomor di log, jadi profile bisa dicocokkan dengan log
+            hashed = number_hash(number)
+            base = os.path.join(self.directory, f"{datetime.now():%Y%m%dT%H%M%S%f}-{kind}-{hashed}")
+            profile.dump_stats(f'{base}.prof')
+
+            stats = pstats.Stats(profile)
+            top = sorted(stats.stats.items(), key=lambda item: -item[1][3])[:20]
+            summary = {
+                "jenis": kind,
+                "nomor_hash": hashed,
+                "waktu": datetime.now().isoformat(),
+                "durasi_detik": round(seconds, 6),
+                "error": str(error) if error else None,
+                "kategori_detik": breakdown(stats),
+                "fungsi_teratas": [
+                    {"fungsi": f"{filename}:{line}({name})", "panggilan": calls, "kumulatif_detik": round(cumtime, 6)}
+                    for (filename, line, name), (_, calls, _, cumtime, _) in top
+                ],
+                "trace": f'{base}.prof'
+            }
+            with open(f'{base}.json', 'w', encoding='utf-8') as f:
+                json.dump(summary, f, indent=2, ensure_ascii=False)
+        except Exception:
+            # profiling tidak boleh menggagalkan analisis
+            pass
@@ -0,0 +1,70 @@
+from collections.abc import Mapping
+from typing import Any, Dict, Hashable, Optional
+
+
+class Section(Mapping):
+    """Bagian report dengan __slots__; nama slot sama dengan key dict aslinya.
+
+    Tetap bisa dibaca seperti dict (result['lokasi']['region'], "error" in result, dst.),
+    dict biasa baru dibuat saat to_dict() / serialisasi JSON.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, *values, **fields):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+        for name, value in fields.items():
+            setattr(self, name, value)
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def __len__(self) -> int:
+        return len(self.__slots__)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: _plain(getattr(self, name)) for name in self.__slots__}
+
+
+def _plain(value):
+    return value.to_dict() if isinstance(value, Section) else value
+
+
+class Interner:
+    """Satu objek bersama untuk section yang isinya identik di banyak report.
+
+    Section seperti lokasi, provider/operator dan zona waktu hanya punya sedikit kombinasi
+    nilai (per provider, region, zona waktu), jadi jutaan report cukup menunjuk ke objek
+    yang sama. maxsize membatasi cache untuk proses yang berjalan lama; cache dikosongkan
+    saat penuh.
+    """
+
+    def __init__(self, maxsize: Optional[int] = None):
+        self.maxsize = maxsize
+        self.cache: Dict[Hashable, Section] = {}
+
+    def get(self, cls, key: Hashable = None, **fields) -> Section:
+        # key wajib diberikan jika ada field yang tidak hashable (mis. dict detail provider)
+        cache_key = (cls, tuple(fields.values()) if key is None else key)
+        section = self.cache.get(cache_key)
+        if section is None:
+            if self.maxsize is not None and len(self.cache) >= self.maxsize:
+                self.cache.clear()
+            section = self.cache[cache_key] = cls(**fields)
+        return section
+
+
+def json_default(value):
+    # dipakai sebagai json.dumps(..., default=json_default)
+    if isinstance(value, Section):
+        return value.to_dict()
+    return str(value)
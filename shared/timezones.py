@@ -0,0 +1,72 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from functools import lru_cache
+
+import phonenumbers
+import pytz
+from phonenumbers import timezone
+from phonenumbers.tzdata import TIMEZONE_LONGEST_PREFIX
+
+# jumlah prefix yang disimpan; prefix yang paling lama tidak dipakai dibuang lebih dulu
+TZ_CACHE_SIZE = 4096
+
+
+class _PrefixCache:
+    """Cache LRU (tipe nomor, prefix) -> daftar zona waktu, aman dipakai banyak thread."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+
+_tz_cache = _PrefixCache(TZ_CACHE_SIZE)
+
+
+def time_zones_for(parsed, number_type=None):
+    # time_zones_for_number hanya melihat tipe nomor dan maksimal
+    # TIMEZONE_LONGEST_PREFIX digit pertama dari nomor E.164
+    if number_type is None:
+        number_type = phonenumbers.number_type(parsed)
+    digits = f"{parsed.country_code}{phonenumbers.national_significant_number(parsed)}"
+    key = (number_type, digits[:TIMEZONE_LONGEST_PREFIX])
+    tz_list = _tz_cache.get(key)
+    if tz_list is None:
+        tz_list = timezone.time_zones_for_number(parsed)
+        _tz_cache.put(key, tz_list)
+    return tz_list
+
+
+@lru_cache(maxsize=None)
+def get_tz(name: str):
+    # jumlah nama zona waktu terbatas (database tz), cache tidak perlu dibatasi
+    return pytz.timezone(name)
+
+
+class LocalTime:
+    # waktu lokal baru diformat saat ditampilkan/diserialisasi
+    __slots__ = ('tz', 'clock')
+
+    def __init__(self, tz, clock: datetime):
+        self.tz = tz
+        self.clock = clock
+
+    def __str__(self):
+        return self.clock.astimezone(self.tz).strftime("%Y-%m-%d %H:%M:%S")
+
+    __repr__ = __str__
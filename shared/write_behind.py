@@ -0,0 +1,174 @@
+import atexit
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Sequence
+
+# mode durability: (PRAGMA synchronous, pemanggil menunggu sampai baris di-commit)
+DURABILITY = {
+    'full': ('FULL', True),
+    'normal': ('NORMAL', False),
+    'fast': ('OFF', False)
+}
+
+_STOP = object()
+
+
+class _Ticket:
+    __slots__ = ('event', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.error = None
+
+
+class WriteBehind:
+    """Penulis SQLite di satu thread latar belakang.
+
+    Baris masuk ke antrian terbatas lalu ditulis per batch dalam satu transaksi. Saat
+    antrian penuh, `submit` menunggu sampai writer mengejar (backpressure), jadi memori
+    tetap terbatas. Mode `full` menunggu commit sebelum `submit` kembali; `normal` dan
+    `fast` kembali segera dan baris ditulis paling lambat `flush_interval` detik kemudian.
+    """
+
+    def __init__(self, db_path: str, insert: str, schema: str = None, durability: str = None,
+                 batch_size: int = 500, flush_interval: float = 0.2, queue_size: int = 10000):
+        durability = durability or os.getenv('PHONE_DB_DURABILITY', 'normal')
+        if durability not in DURABILITY:
+            raise ValueError(f"Durability tidak dikenal: {durability} (pilih: {', '.join(DURABILITY)})")
+        self.db_path = db_path
+        self.insert = insert
+        self.schema = schema
+        self.durability = durability
+        self.synchronous, self.wait_commit = DURABILITY[durability]
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.stats = {"written": 0, "batches": 0, "failed": 0, "backpressure": 0}
+        self._lock = threading.Lock()
+        # submit/flush yang sedang memasukkan item; close menunggu sampai nol sebelum _STOP
+        self._active = 0
+        self._idle = threading.Condition(self._lock)
+        self._closed = False
+        self._conn = None
+        self._thread = threading.Thread(target=self._run, name=f'write-behind:{db_path}', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, row: Sequence[Any]):
+        ticket = _Ticket() if self.wait_commit else None
+        if not self._enqueue((row, ticket)):
+            raise RuntimeError(f"WriteBehind untuk {self.db_path} sudah ditutup")
+        if ticket is not None:
+            ticket.event.wait()
+            if ticket.error is not None:
+                raise ticket.error
+
+    def flush(self, timeout: float = None) -> bool:
+        """Tunggu sampai semua baris yang sudah di-submit ter-commit."""
+        ticket = _Ticket()
+        if not self._enqueue((None, ticket)):
+            return True
+        return ticket.event.wait(timeout)
+
+    def close(self, timeout: float = 30.0):
+        # tulis sisa antrian lalu hentikan thread writer
+        with self._idle:
+            if self._closed:
+                return
+            self._closed = True
+            # _STOP harus menjadi item terakhir: tunggu submit yang sudah lolos cek _closed
+            while self._active:
+                self._idle.wait()
+        self.queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def pending(self) -> int:
+        return self.queue.qsize()
+
+    def info(self) -> Dict[str, Any]:
+        return {"durability": self.durability, "pending": self.pending(), **self.stats}
+
+    def _enqueue(self, item) -> bool:
+        with self._idle:
+            if self._closed:
+                return False
+            self._active += 1
+        try:
+            # put di luar lock: saat antrian penuh submit lain dan close tidak ikut terblokir
+            try:
+                self.queue.put_nowait(item)
+            except queue.Full:
+                with self._lock:
+                    self.stats["backpressure"] += 1
+                self.queue.put(item)
+        finally:
+            with self._idle:
+                self._active -= 1
+                if not self._active:
+                    self._idle.notify_all()
+        return True
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(f'PRAGMA synchronous={self.synchronous}')
+        if self.schema:
+            conn.execute(self.schema)
+            conn.commit()
+        return conn
+
+    def _collect(self, first):
+        # ambil baris yang sudah mengantri; tunggu sebentar lagi hanya jika tidak ada yang menunggu commit
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            if batch[-1] is _STOP or batch[-1][0] is None:
+                break
+            waiting = any(ticket is not None for _, ticket in batch)
+            try:
+                if waiting:
+                    item = self.queue.get_nowait()
+                else:
+                    item = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            batch.append(item)
+        return batch
+
+    def _write(self, items):
+        rows = [row for row, _ in items if row is not None]
+        error = None
+        try:
+            if self._conn is None:
+                self._conn = self._connect()
+            if rows:
+                with self._conn:
+                    self._conn.executemany(self.insert, rows)
+                self.stats["written"] += len(rows)
+                self.stats["batches"] += 1
+        except Exception as e:
+            error = e
+            self.stats["failed"] += len(rows)
+            logging.error(f"Gagal menulis {len(rows)} baris ke {self.db_path}: {e}")
+        for row, ticket in items:
+            if ticket is not None:
+                ticket.error = error if row is not None else None
+                ticket.event.set()
+
+    def _run(self):
+        try:
+            stop = False
+            while not stop:
+                batch = self._collect(self.queue.get())
+                if batch[-1] is _STOP:
+                    stop = True
+                    batch.pop()
+                if batch:
+                    self._write(batch)
+        finally:
+            if self._conn is not None:
+                self._conn.close()